@@ -15,7 +15,7 @@ from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Union
+from typing import Dict, List, Optional, Set, Union
 from urllib.parse import quote
 
 import aiohttp
@@ -23,6 +23,9 @@ from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import numpy as np
 
+# Rows scored against the whole corpus per step when finding thematic pairs
+_SIMILARITY_BLOCK_ROWS = 256
+
 
 class RelationshipType(Enum):
     """Types of relationships between books."""
@@ -158,7 +161,6 @@ class BookRelationshipMapper:
         self.thematic_clusters: List[ThematicCluster] = []
         
         # Caches
-        self._similarity_cache: Dict[Tuple[str, str], float] = {}
         self._recommendation_cache: Dict[str, List[RecommendationResult]] = {}
         
         # Load existing data
@@ -281,7 +283,6 @@ class BookRelationshipMapper:
         """Add a book to the relationship mapping system."""
         self.books[book.book_id] = book
         # Clear caches when new book is added
-        self._similarity_cache.clear()
         self._recommendation_cache.clear()
         self._feature_matrix = None
     
@@ -290,7 +291,6 @@ class BookRelationshipMapper:
         for book in books:
             self.books[book.book_id] = book
         # Clear caches
-        self._similarity_cache.clear()
         self._recommendation_cache.clear()
         self._feature_matrix = None
     
@@ -490,22 +490,23 @@ class BookRelationshipMapper:
             self._build_feature_matrix()
         
         relationships = []
+        book_count = len(self._book_ids_order)
         
-        # Calculate pairwise similarities
-        for i, source_id in enumerate(self._book_ids_order):
-            for j, target_id in enumerate(self._book_ids_order[i+1:], i+1):
-                cache_key = (source_id, target_id)
-                
-                if cache_key in self._similarity_cache:
-                    similarity = self._similarity_cache[cache_key]
-                else:
-                    similarity = cosine_similarity(
-                        self._feature_matrix[i:i+1],
-                        self._feature_matrix[j:j+1]
-                    )[0][0]
-                    self._similarity_cache[cache_key] = similarity
+        # Score a block of books against the corpus at a time instead of
+        # materializing the full pairwise similarity matrix
+        for block_start in range(0, book_count, _SIMILARITY_BLOCK_ROWS):
+            block_end = min(block_start + _SIMILARITY_BLOCK_ROWS, book_count)
+            block = cosine_similarity(self._feature_matrix[block_start:block_end], self._feature_matrix)
+            
+            for i in range(block_start, block_end):
+                source_id = self._book_ids_order[i]
+                row = block[i - block_start]
                 
-                if similarity > self.similarity_threshold:
+                # Only later books above the threshold, so each pair is visited once
+                for j in np.flatnonzero(row[i+1:] > self.similarity_threshold) + i + 1:
+                    target_id = self._book_ids_order[j]
+                    similarity = row[j]
+                    
                     # Identify common themes
                     common_themes = self._identify_common_themes(source_id, target_id)
                     
@@ -590,28 +591,21 @@ class BookRelationshipMapper:
             self._build_feature_matrix()
         
         clusters = []
-        used_books = set()
+        # Membership is tracked by position in _book_ids_order, so the inner scan needs no id lookups
+        used = np.zeros(len(self._book_ids_order), dtype=bool)
         
         # Simple clustering based on similarity threshold
         for i, source_id in enumerate(self._book_ids_order):
-            if source_id in used_books:
+            if used[i]:
                 continue
             
-            cluster_books = [source_id]
-            cluster_similarities = []
+            similarities = cosine_similarity(self._feature_matrix[i:i+1], self._feature_matrix)[0]
+            candidates = ~used & (similarities > self.similarity_threshold * 1.5)  # Higher threshold for clusters
+            candidates[i] = False
+            members = np.flatnonzero(candidates)
             
-            for j, target_id in enumerate(self._book_ids_order):
-                if i == j or target_id in used_books:
-                    continue
-                
-                similarity = cosine_similarity(
-                    self._feature_matrix[i:i+1],
-                    self._feature_matrix[j:j+1]
-                )[0][0]
-                
-                if similarity > self.similarity_threshold * 1.5:  # Higher threshold for clusters
-                    cluster_books.append(target_id)
-                    cluster_similarities.append(similarity)
+            cluster_books = [source_id] + [self._book_ids_order[j] for j in members]
+            cluster_similarities = similarities[members]
             
             if len(cluster_books) >= min_cluster_size:
                 # Generate cluster theme
@@ -623,10 +617,11 @@ class BookRelationshipMapper:
                     theme=theme,
                     books=cluster_books,
                     keywords=keywords,
-                    confidence=np.mean(cluster_similarities) if cluster_similarities else 0.0
+                    confidence=np.mean(cluster_similarities) if cluster_similarities.size else 0.0
                 )
                 clusters.append(cluster)
-                used_books.update(cluster_books)
+                used[i] = True
+                used[members] = True
         
         self.thematic_clusters = clusters
         return clusters
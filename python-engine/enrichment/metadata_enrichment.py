@@ -1,7 +1,7 @@
 import requests
 import time
 import logging
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import json
 import hashlib
@@ -24,11 +24,13 @@ class BookMetadata:
     confidence: float
 
 class MetadataEnricher:
-    def __init__(self, google_books_api_key: Optional[str] = None):
+    def __init__(self, google_books_api_key: Optional[str] = None,
+                 clock: Callable[[], float] = time.monotonic):
         self.google_books_api_key = google_books_api_key
         self.logger = logging.getLogger(__name__)
         self.rate_limit_delay = 1.0  # seconds between API calls
-        self.last_request_time = 0
+        self._clock = clock  # injectable so tests can run deterministically
+        self.last_request_time = float('-inf')
         
         # Cache for API responses
         self.cache = {}
@@ -350,14 +352,14 @@ class MetadataEnricher:
         
     def _respect_rate_limit(self):
         """Ensure rate limiting between API calls"""
-        current_time = time.time()
+        current_time = self._clock()
         time_since_last = current_time - self.last_request_time
         
         if time_since_last < self.rate_limit_delay:
             sleep_time = self.rate_limit_delay - time_since_last
             time.sleep(sleep_time)
             
-        self.last_request_time = time.time()
+        self.last_request_time = self._clock()
         
     def get_book_details(self, isbn: str) -> Optional[BookMetadata]:
         """Get detailed book information by ISBN"""
@@ -0,0 +1,39 @@
+"""
+Tests for the MetadataEnricher rate limiter clock.
+"""
+
+import itertools
+from unittest.mock import patch
+
+try:
+    from .metadata_enrichment import MetadataEnricher
+except ImportError:
+    from metadata_enrichment import MetadataEnricher
+
+
+class TestMetadataEnricherClock:
+    """Test clock injection for the rate limiter."""
+    
+    def test_injected_clock_drives_rate_limit(self):
+        """Test that the rate limiter reads the injected clock, not time.time()."""
+        ticks = itertools.count()
+        enricher = MetadataEnricher(clock=lambda: next(ticks))
+        
+        with patch('time.sleep') as mock_sleep:
+            enricher._respect_rate_limit()
+            enricher._respect_rate_limit()
+            
+            mock_sleep.assert_not_called()
+        
+        assert enricher.last_request_time == 3
+    
+    def test_injected_clock_enforces_delay(self):
+        """Test that calls closer than the delay sleep for the remainder."""
+        enricher = MetadataEnricher(clock=lambda: 10.0)
+        
+        with patch('time.sleep') as mock_sleep:
+            enricher._respect_rate_limit()
+            mock_sleep.assert_not_called()
+            
+            enricher._respect_rate_limit()
+            mock_sleep.assert_called_once_with(enricher.rate_limit_delay)
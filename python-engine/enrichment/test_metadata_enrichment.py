@@ -25,6 +25,10 @@ except ImportError:
     )
 
 
+# Fixed timestamp so tests never touch the wall clock
+FIXED_TIMESTAMP = datetime(2024, 1, 1, 12, 0, 0)
+
+
 class TestBookIdentifier:
     """Test BookIdentifier functionality."""
     
@@ -291,7 +295,7 @@ class TestMetadataEnrichmentEngine:
             publisher=PublisherInfo(name="Test Publisher"),
             page_count=200,
             enrichment_sources=[MetadataSource.GOOGLE_BOOKS],
-            enrichment_timestamp=datetime.now()
+            enrichment_timestamp=FIXED_TIMESTAMP
         )
     
     def test_cache_key_generation(self, engine):
@@ -347,7 +351,7 @@ class TestMetadataEnrichmentEngine:
             title="Test Book",
             authors=[AuthorInfo(name="Test Author")],
             enrichment_sources=[MetadataSource.GOOGLE_BOOKS],
-            enrichment_timestamp=datetime.now()
+            enrichment_timestamp=FIXED_TIMESTAMP
         )
         
         with patch.object(engine.enrichers[MetadataSource.GOOGLE_BOOKS], 'enrich') as mock_enrich:
@@ -375,7 +379,7 @@ class TestMetadataEnrichmentEngine:
         mock_metadata = EnrichedMetadata(
             title="Test Book",
             enrichment_sources=[MetadataSource.GOOGLE_BOOKS],
-            enrichment_timestamp=datetime.now()
+            enrichment_timestamp=FIXED_TIMESTAMP
         )
         
         with patch.object(engine, 'enrich_book') as mock_enrich:
@@ -419,7 +423,7 @@ class TestUtilityFunctions:
             mock_instance = MockEngine.return_value
             mock_metadata = EnrichedMetadata(
                 title="Test Book",
-                enrichment_timestamp=datetime.now()
+                enrichment_timestamp=FIXED_TIMESTAMP
             )
             mock_instance.enrich_book = AsyncMock(return_value=mock_metadata)
             
@@ -446,8 +450,8 @@ class TestUtilityFunctions:
             with patch('metadata_enrichment.MetadataEnrichmentEngine') as MockEngine:
                 mock_instance = MockEngine.return_value
                 mock_results = [
-                    EnrichedMetadata(title="Book 1", enrichment_timestamp=datetime.now()),
-                    EnrichedMetadata(title="Book 2", enrichment_timestamp=datetime.now())
+                    EnrichedMetadata(title="Book 1", enrichment_timestamp=FIXED_TIMESTAMP),
+                    EnrichedMetadata(title="Book 2", enrichment_timestamp=FIXED_TIMESTAMP)
                 ]
                 mock_instance.batch_enrich = AsyncMock(return_value=mock_results)
                 
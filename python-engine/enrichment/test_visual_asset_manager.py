@@ -4,458 +4,499 @@ Test suite for Visual Asset Manager
 
 Comprehensive tests for the visual asset management system including:
 - Asset downloading and caching
-- Image optimization and format conversion
-- Fallback handling
-- Registry management
-- Batch processing
+- Image optimization
+- Failure handling
+- Book relationship detection
 - Cache cleanup
 """
 
 import asyncio
+import gc
+import hashlib
+import io
 import json
+import os
+import stat
 import tempfile
+import threading
+import time
 import unittest
-from datetime import datetime, timedelta
+import weakref
+from dataclasses import asdict
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import patch
 
-import aiohttp
+import requests
 from PIL import Image
 
-from visual_asset_manager import (
-    AssetMetadata, AssetCollection, AssetQuality, AssetType, 
-    OptimizationConfig, OptimizationFormat, VisualAssetManager,
-    download_book_cover, download_author_photo, get_book_cover_path
-)
+from visual_asset_manager import _FILE_MODE, _STREAM_CHUNK_SIZE, BookRelationship, VisualAsset, VisualAssetManager
 
 
-class TestAssetMetadata(unittest.TestCase):
-    """Test asset metadata functionality."""
-    
-    def test_asset_metadata_creation(self):
-        """Test basic asset metadata creation."""
-        metadata = AssetMetadata(
-            asset_id="test123",
-            asset_type=AssetType.COVER_IMAGE,
-            source_url="https://example.com/cover.jpg"
-        )
-        
-        self.assertEqual(metadata.asset_id, "test123")
-        self.assertEqual(metadata.asset_type, AssetType.COVER_IMAGE)
-        self.assertEqual(metadata.source_url, "https://example.com/cover.jpg")
-        self.assertIsNone(metadata.local_path)
-        self.assertFalse(metadata.fallback_used)
-        self.assertEqual(metadata.error_count, 0)
-    
-    def test_asset_collection_creation(self):
-        """Test asset collection creation and management."""
-        collection = AssetCollection(
-            entity_id="book123",
-            entity_type="book"
-        )
-        
-        self.assertEqual(collection.entity_id, "book123")
-        self.assertEqual(collection.entity_type, "book")
-        self.assertEqual(len(collection.assets), 0)
-        self.assertIsNone(collection.primary_cover)
-        self.assertIsInstance(collection.created_date, datetime)
+# Encode the fixture JPEG once per module; tests only need its bytes.
+_buf = io.BytesIO()
+Image.new('RGB', (400, 600), color='blue').save(_buf, 'JPEG')
+_TEST_JPEG_BYTES = _buf.getvalue()
+del _buf
+
+
+class _FakeRaw(io.BytesIO):
+    """Stand-in for ``response.raw`` that only allows bounded reads."""
+    decode_content = False
+    
+    def read(self, size=-1):
+        if size is None or size < 0:
+            raise AssertionError("response body read in one go")
+        return super().read(size)
+
+
+class _FakeResponse:
+    """Stand-in for a streamed ``requests`` response."""
+    
+    def __init__(self, body: bytes = _TEST_JPEG_BYTES, status_code: int = 200):
+        self.raw = _FakeRaw(body)
+        self.status_code = status_code
+    
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Client Error")
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
 
 
-class TestOptimizationConfig(unittest.TestCase):
-    """Test optimization configuration."""
-    
-    def test_default_config(self):
-        """Test default optimization configuration."""
-        config = OptimizationConfig()
-        
-        self.assertEqual(config.target_format, OptimizationFormat.WEBP)
-        self.assertIn(AssetQuality.THUMBNAIL, config.quality_levels)
-        self.assertIn(AssetQuality.SMALL, config.quality_levels)
-        self.assertIn(AssetQuality.MEDIUM, config.quality_levels)
-        self.assertEqual(config.jpeg_quality, 85)
-        self.assertEqual(config.webp_quality, 80)
-        self.assertTrue(config.progressive)
-    
-    def test_custom_config(self):
-        """Test custom optimization configuration."""
-        config = OptimizationConfig(
-            target_format=OptimizationFormat.JPEG,
-            quality_levels=[AssetQuality.SMALL, AssetQuality.LARGE],
-            jpeg_quality=90,
-            max_file_size=5 * 1024 * 1024
+class TestVisualAsset(unittest.TestCase):
+    """Test visual asset record functionality."""
+    
+    def test_visual_asset_creation(self):
+        """Test basic visual asset creation."""
+        asset = VisualAsset(
+            id="test123",
+            url="https://example.com/cover.jpg",
+            local_path="/tmp/cover.jpg",
+            asset_type="cover",
+            width=400,
+            height=600,
+            file_size=1024,
+            format="JPEG",
+            checksum="abc"
         )
         
-        self.assertEqual(config.target_format, OptimizationFormat.JPEG)
-        self.assertEqual(len(config.quality_levels), 2)
-        self.assertEqual(config.jpeg_quality, 90)
-        self.assertEqual(config.max_file_size, 5 * 1024 * 1024)
+        self.assertEqual(asset.id, "test123")
+        self.assertEqual(asset.asset_type, "cover")
+        self.assertIsNone(asset.book_id)
+        self.assertIsNone(asset.author_name)
+        self.assertIsNone(asset.publisher_name)
+        
+        # Cache records round-trip through asdict
+        self.assertEqual(VisualAsset(**asdict(asset)), asset)
 
 
-class TestVisualAssetManager(unittest.IsolatedAsyncioTestCase):
+class TestVisualAssetManager(unittest.TestCase):
     """Test visual asset manager functionality."""
     
-    async def asyncSetUp(self):
-        """Set up test environment."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.cache_dir = Path(self.temp_dir) / "assets"
-        self.manager = VisualAssetManager(
-            cache_dir=self.cache_dir,
-            max_concurrent_downloads=2,
-            cache_expiry_days=1
-        )
-        
-        # Create test image for mocking
-        self.test_image_path = Path(self.temp_dir) / "test_image.jpg"
-        self._create_test_image(self.test_image_path, (400, 600))
+    @classmethod
+    def setUpClass(cls):
+        """Patch requests.Session.get once for the whole class."""
+        patcher = patch.object(requests.Session, 'get',
+                               side_effect=lambda *args, **kwargs: _FakeResponse())
+        cls.mock_get = patcher.start()
+        cls.addClassCleanup(patcher.stop)
     
-    async def asyncTearDown(self):
-        """Clean up test environment."""
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
+    def setUp(self):
+        """Set up a manager over a fresh assets directory."""
+        self.mock_get.reset_mock()
+        
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = Path(temp_dir.name)
+        self.assets_dir = self.temp_dir / "assets"
+        
+        self.manager = VisualAssetManager(assets_dir=str(self.assets_dir))
+        self.manager.download_delay = 0  # No rate limiting against the mock
+        self.addCleanup(self.manager.close)
     
-    def _create_test_image(self, path: Path, size: tuple = (300, 400)):
-        """Create a test image file."""
-        path.parent.mkdir(parents=True, exist_ok=True)
-        img = Image.new('RGB', size, color='blue')
-        img.save(path, 'JPEG')
+    def _write_image(self, name: str, size=(400, 600), image_format='JPEG') -> Path:
+        """Write a solid test image into the temp directory."""
+        path = self.temp_dir / name
+        Image.new('RGB', size, color='blue').save(path, image_format)
+        return path
     
     def test_initialization(self):
         """Test manager initialization."""
-        self.assertTrue(self.cache_dir.exists())
-        self.assertTrue((self.cache_dir / "covers").exists())
-        self.assertTrue((self.cache_dir / "authors").exists())
-        self.assertTrue((self.cache_dir / "optimized").exists())
-        self.assertEqual(self.manager.max_concurrent_downloads, 2)
-        self.assertEqual(self.manager.cache_expiry_days, 1)
+        for subdir in ('covers', 'authors', 'publishers', 'thumbnails'):
+            self.assertTrue((self.assets_dir / subdir).is_dir())
+        self.assertTrue(self.manager.db_path.exists())
+        self.assertEqual(self.manager.asset_cache, {})
+        self.assertEqual(self.manager.relationships, [])
     
     def test_asset_id_generation(self):
         """Test asset ID generation."""
         url = "https://example.com/cover.jpg"
-        asset_type = AssetType.COVER_IMAGE
         
-        asset_id1 = self.manager._generate_asset_id(url, asset_type)
-        asset_id2 = self.manager._generate_asset_id(url, asset_type)
+        asset_id1 = self.manager._generate_asset_id(url)
+        asset_id2 = self.manager._generate_asset_id(url)
         
         self.assertEqual(asset_id1, asset_id2)  # Same input should give same ID
-        self.assertEqual(len(asset_id1), 32)  # MD5 hash length
+        self.assertEqual(len(asset_id1), 32)  # 16-byte digest as hex
     
-    def test_asset_path_generation(self):
-        """Test asset path generation."""
-        asset_id = "test123"
-        asset_type = AssetType.COVER_IMAGE
-        quality = AssetQuality.MEDIUM
+    def test_asset_id_collisions(self):
+        """Test asset IDs stay unique over many URLs."""
+        urls = [f"https://example.com/covers/{i}.jpg" for i in range(10000)]
         
-        path = self.manager._get_asset_path(asset_id, asset_type, quality)
+        ids = {self.manager._generate_asset_id(url) for url in urls}
         
-        expected_path = self.cache_dir / "optimized" / f"{asset_id}_{quality.value}.webp"
-        self.assertEqual(path, expected_path)
-    
-    def test_image_metadata_extraction(self):
-        """Test image metadata extraction."""
-        metadata = self.manager._extract_image_metadata(self.test_image_path)
-        
-        self.assertEqual(metadata['width'], 400)
-        self.assertEqual(metadata['height'], 600)
-        self.assertEqual(metadata['format'], 'jpeg')
-        self.assertGreater(metadata['file_size'], 0)
+        self.assertEqual(len(ids), len(urls))
     
     def test_checksum_calculation(self):
-        """Test checksum calculation."""
-        content1 = b"test content"
-        content2 = b"test content"
-        content3 = b"different content"
+        """Test checksum calculation and verification."""
+        checksum = self.manager._calculate_checksum(_TEST_JPEG_BYTES)
+        self.assertEqual(checksum, hashlib.sha256(_TEST_JPEG_BYTES).hexdigest())
+        
+        path = self.temp_dir / "image.jpg"
+        path.write_bytes(_TEST_JPEG_BYTES)
+        self.assertTrue(self.manager._verify_checksum(str(path), checksum))
+        self.assertFalse(self.manager._verify_checksum(str(path), "0" * 64))
+        self.assertFalse(self.manager._verify_checksum(str(self.temp_dir / "missing.jpg"), checksum))
+        
+        # Assets cached before the SHA-256 switch carry MD5 checksums
+        self.assertTrue(self.manager._verify_checksum(str(path), hashlib.md5(_TEST_JPEG_BYTES).hexdigest()))
+    
+    def test_download_cover_image_success(self):
+        """Test successful cover download."""
+        url = "https://example.com/cover.jpg"
         
-        checksum1 = self.manager._calculate_checksum(content1)
-        checksum2 = self.manager._calculate_checksum(content2)
-        checksum3 = self.manager._calculate_checksum(content3)
+        result = self.manager.download_cover_image(url, "book123", "Test Book")
         
-        self.assertEqual(checksum1, checksum2)
-        self.assertNotEqual(checksum1, checksum3)
+        self.assertIsNotNone(result)
+        self.assertEqual(result.asset_type, "cover")
+        self.assertEqual(result.url, url)
+        self.assertEqual(result.book_id, "book123")
+        self.assertEqual((result.width, result.height), (400, 600))
+        self.assertEqual(result.format, "JPEG")
+        self.assertEqual(result.file_size, len(_TEST_JPEG_BYTES))
+        self.assertEqual(result.checksum, hashlib.sha256(_TEST_JPEG_BYTES).hexdigest())
+        self.assertEqual(Path(result.local_path).read_bytes(), _TEST_JPEG_BYTES)
+        # Stored with the umask's mode, not mkstemp's private 0600
+        self.assertEqual(stat.S_IMODE(os.stat(result.local_path).st_mode), _FILE_MODE)
+        
+        thumbnail = self.assets_dir / "thumbnails" / f"thumb_{Path(result.local_path).name}"
+        with Image.open(thumbnail) as image:
+            self.assertLessEqual(image.width, 300)
+            self.assertLessEqual(image.height, 400)
+        
+        # No partial downloads are left behind
+        self.assertEqual(list(self.assets_dir.rglob("*.part")), [])
     
-    async def test_download_asset_success(self):
-        """Test successful asset download."""
+    def test_download_cover_image_cached(self):
+        """Test a second download of the same URL is served from the cache."""
         url = "https://example.com/cover.jpg"
-        entity_id = "book123"
         
-        # Mock HTTP response
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.read.return_value = self.test_image_path.read_bytes()
+        first = self.manager.download_cover_image(url, "book123", "Test Book")
+        second = self.manager.download_cover_image(url, "book123", "Test Book")
         
-        with patch('aiohttp.ClientSession.get') as mock_get:
-            mock_get.return_value.__aenter__.return_value = mock_response
+        self.assertEqual(second, first)
+        self.assertEqual(self.mock_get.call_count, 1)
+    
+    def test_cached_asset_rehashed_only_when_file_changes(self):
+        """Test cache hits stat the file and only re-hash it after a change."""
+        asset = self.manager.download_cover_image("https://example.com/cover.jpg", "book123", "Test Book")
+        
+        with patch.object(self.manager, '_verify_checksum', wraps=self.manager._verify_checksum) as mock_verify:
+            for _ in range(5):
+                self.assertEqual(self.manager._get_cached_asset(asset.id), asset)
+            self.assertEqual(mock_verify.call_count, 1)
             
-            async with self.manager:
-                result = await self.manager.download_asset(
-                    url, AssetType.COVER_IMAGE, entity_id
-                )
-        
-        self.assertIsNotNone(result)
-        self.assertEqual(result.asset_type, AssetType.COVER_IMAGE)
-        self.assertEqual(result.source_url, url)
-        self.assertFalse(result.fallback_used)
-        self.assertEqual(result.error_count, 0)
-        self.assertIsNotNone(result.local_path)
-        self.assertTrue(Path(result.local_path).exists())
+            # A truncated file changes size, so it is re-hashed and rejected
+            Path(asset.local_path).write_bytes(_TEST_JPEG_BYTES[:100])
+            self.assertIsNone(self.manager._get_cached_asset(asset.id))
+            self.assertEqual(mock_verify.call_count, 2)
+        
+        # And the next download fetches it again
+        self.mock_get.reset_mock()
+        self.manager.download_cover_image("https://example.com/cover.jpg", "book123", "Test Book")
+        self.mock_get.assert_called_once()
     
-    async def test_download_asset_failure(self):
-        """Test asset download failure handling."""
-        url = "https://example.com/nonexistent.jpg"
-        entity_id = "book123"
+    def test_download_cover_image_failure(self):
+        """Test cover download failure handling."""
+        with patch.object(self.manager.session, 'get', return_value=_FakeResponse(b"", status_code=404)):
+            result = self.manager.download_cover_image("https://example.com/missing.jpg", "book123", "Test")
         
-        # Mock HTTP failure
-        with patch('aiohttp.ClientSession.get') as mock_get:
-            mock_get.side_effect = aiohttp.ClientError("Network error")
+        self.assertIsNone(result)
+        self.assertEqual(self.manager.asset_cache, {})
+        self.assertEqual(list(self.assets_dir.rglob("*.part")), [])
+        
+        # Empty URLs are skipped without a request
+        self.assertIsNone(self.manager.download_cover_image("", "book123", "Test"))
+    
+    def test_fetch_streams_body_to_part_file(self):
+        """Test _fetch copies the body to disk in bounded reads while hashing it."""
+        body = _TEST_JPEG_BYTES + b"\0" * (2 * _STREAM_CHUNK_SIZE)
+        response = _FakeResponse(body)
+        read_sizes = []
+        raw_read = response.raw.read
+        
+        def read(size=-1):
+            read_sizes.append(size)
+            return raw_read(size)
+        response.raw.read = read
+        
+        with patch.object(self.manager.session, 'get', return_value=response):
+            part_path, checksum = self.manager._fetch("https://example.com/large.jpg", self.assets_dir / "covers")
+        self.addCleanup(part_path.unlink, missing_ok=True)
+        
+        self.assertEqual(part_path.suffix, ".part")
+        self.assertEqual(part_path.read_bytes(), body)
+        self.assertEqual(checksum, hashlib.sha256(body).hexdigest())
+        self.assertGreater(len(read_sizes), 2)
+        self.assertLessEqual(max(read_sizes), _STREAM_CHUNK_SIZE)
+    
+    def test_download_covers_batch(self):
+        """Test batch downloads overlap, respect the per-host cap and keep input order."""
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+        
+        class _SlowResponse(_FakeResponse):
+            def __enter__(self):
+                with lock:
+                    in_flight[0] += 1
+                    peak[0] = max(peak[0], in_flight[0])
+                time.sleep(0.02)
+                return self
             
-            async with self.manager:
-                result = await self.manager.download_asset(
-                    url, AssetType.COVER_IMAGE, entity_id
-                )
+            def __exit__(self, *exc_info):
+                with lock:
+                    in_flight[0] -= 1
+                return False
+        
+        covers = [(f"https://example.com/cover{i}.jpg", f"book{i}", f"Book {i}") for i in range(8)]
+        covers.insert(3, ("", "book_no_url", "No URL"))
+        
+        with patch.object(self.manager.session, 'get', side_effect=lambda *args, **kwargs: _SlowResponse()):
+            results = self.manager.download_covers_batch(covers, max_workers=8, cpu_workers=1)
+        
+        self.assertEqual(len(results), len(covers))
+        self.assertIsNone(results[3])
+        for (url, book_id, _), result in zip(covers, results):
+            if url:
+                self.assertEqual((result.url, result.book_id), (url, book_id))
+                self.assertTrue(Path(result.local_path).exists())
+        self.assertGreater(peak[0], 1)
+        self.assertLessEqual(peak[0], self.manager.max_per_host)
+        
+        # A second batch is served from the cache
+        self.mock_get.reset_mock()
+        self.assertEqual(self.manager.download_covers_batch(covers, cpu_workers=1), results)
+        self.mock_get.assert_not_called()
+        
+        # The render pool is kept for later batches until close()
+        pool = self.manager._render_pools[1]
+        more = [(f"https://example.com/more{i}.jpg", f"more{i}", f"More {i}") for i in range(4)]
+        self.assertTrue(all(self.manager.download_covers_batch(more, cpu_workers=1)))
+        self.assertIs(self.manager._render_pools[1], pool)
+        self.manager.close()
+        self.assertEqual(self.manager._render_pools, {})
+    
+    def test_small_batch_renders_in_process(self):
+        """Test a batch of a few covers skips starting render worker processes."""
+        covers = [(f"https://example.com/small{i}.jpg", f"book{i}", f"Book {i}") for i in range(2)]
         
-        self.assertIsNotNone(result)
-        self.assertTrue(result.fallback_used)
-        self.assertEqual(result.error_count, self.manager.max_retries)
-        self.assertIsNotNone(result.last_error)
-    
-    async def test_batch_download(self):
-        """Test batch asset downloading."""
-        requests = [
-            ("https://example.com/cover1.jpg", AssetType.COVER_IMAGE, "book1", "book"),
-            ("https://example.com/cover2.jpg", AssetType.COVER_IMAGE, "book2", "book"),
-            ("https://example.com/author1.jpg", AssetType.AUTHOR_PHOTO, "author1", "author")
-        ]
+        results = self.manager.download_covers_batch(covers)
         
-        # Mock HTTP responses
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.read.return_value = self.test_image_path.read_bytes()
+        self.assertEqual([result.book_id for result in results], ["book0", "book1"])
+        thumbnail = self.assets_dir / "thumbnails" / f"thumb_{Path(results[0].local_path).name}"
+        self.assertTrue(thumbnail.exists())
+        self.assertEqual(self.manager._render_pools, {})
+    
+    def test_download_covers_async(self):
+        """Test the awaitable batch API downloads through the shared session, in input order."""
+        covers = [(f"https://example.com/async{i}.jpg", f"book{i}", f"Book {i}") for i in range(3)]
+        covers.insert(1, ("", "missing", "Missing"))
         
-        with patch('aiohttp.ClientSession.get') as mock_get:
-            mock_get.return_value.__aenter__.return_value = mock_response
-            
-            async with self.manager:
-                results = await self.manager.batch_download_assets(requests)
-        
-        self.assertEqual(len(results), 3)
-        for result in results:
-            self.assertIsNotNone(result)
-            self.assertFalse(result.fallback_used)
-    
-    def test_registry_persistence(self):
-        """Test asset registry save and load."""
-        # Create test asset
-        asset = AssetMetadata(
-            asset_id="test123",
-            asset_type=AssetType.COVER_IMAGE,
-            source_url="https://example.com/cover.jpg",
-            local_path=str(self.test_image_path),
-            width=400,
-            height=600
-        )
+        results = asyncio.run(self.manager.download_covers_async(covers, max_concurrency=2))
         
-        # Add to registry
-        self.manager._add_to_registry("book123", "book", asset)
-        
-        # Save registry
-        self.manager._save_registry()
-        
-        # Create new manager and load registry
-        new_manager = VisualAssetManager(cache_dir=self.cache_dir)
-        
-        # Check if asset was loaded
-        self.assertIn("book123", new_manager.asset_registry)
-        collection = new_manager.asset_registry["book123"]
-        self.assertIn(AssetType.COVER_IMAGE, collection.assets)
-        loaded_asset = collection.assets[AssetType.COVER_IMAGE][0]
-        self.assertEqual(loaded_asset.asset_id, asset.asset_id)
-        self.assertEqual(loaded_asset.source_url, asset.source_url)
-    
-    def test_asset_validation(self):
-        """Test asset validation logic."""
-        # Valid asset
-        valid_asset = AssetMetadata(
-            asset_id="test123",
-            asset_type=AssetType.COVER_IMAGE,
-            source_url="https://example.com/cover.jpg",
-            local_path=str(self.test_image_path),
-            cache_expires=datetime.now() + timedelta(days=1)
-        )
-        self.assertTrue(self.manager._is_asset_valid(valid_asset))
-        
-        # Expired asset
-        expired_asset = AssetMetadata(
-            asset_id="test456",
-            asset_type=AssetType.COVER_IMAGE,
-            source_url="https://example.com/cover.jpg",
-            cache_expires=datetime.now() - timedelta(days=1)
-        )
-        self.assertFalse(self.manager._is_asset_valid(expired_asset))
-        
-        # Fallback asset
-        fallback_asset = AssetMetadata(
-            asset_id="test789",
-            asset_type=AssetType.COVER_IMAGE,
-            source_url="https://example.com/cover.jpg",
-            fallback_used=True
-        )
-        self.assertFalse(self.manager._is_asset_valid(fallback_asset))
-    
-    def test_get_asset_url(self):
-        """Test asset URL retrieval."""
-        # Add test asset to registry
-        asset = AssetMetadata(
-            asset_id="test123",
-            asset_type=AssetType.COVER_IMAGE,
-            source_url="https://example.com/cover.jpg",
-            local_path=str(self.test_image_path)
-        )
-        self.manager._add_to_registry("book123", "book", asset)
-        
-        # Get asset URL
-        url = self.manager.get_asset_url("book123", AssetType.COVER_IMAGE)
-        self.assertEqual(url, str(self.test_image_path))
-        
-        # Get URL for non-existent asset (should return fallback)
-        fallback_url = self.manager.get_asset_url("nonexistent", AssetType.COVER_IMAGE)
-        self.assertIn("fallbacks", fallback_url)
-    
-    def test_target_size_calculation(self):
-        """Test target size calculation for different quality levels."""
-        sizes = {
-            AssetQuality.THUMBNAIL: (150, 150),
-            AssetQuality.SMALL: (300, 300),
-            AssetQuality.MEDIUM: (600, 600),
-            AssetQuality.LARGE: (1200, 1200)
-        }
+        self.assertIsNone(results[1])
+        self.assertEqual([result.book_id for result in results if result], ["book0", "book1", "book2"])
+        self.assertEqual(self.mock_get.call_count, 3)
+    
+    def test_download_author_photo(self):
+        """Test author photo download."""
+        result = self.manager.download_author_photo("https://example.com/author.jpg", "Jane Doe")
         
-        for quality, expected_size in sizes.items():
-            size = self.manager._get_target_size(quality)
-            self.assertEqual(size, expected_size)
+        self.assertIsNotNone(result)
+        self.assertEqual(result.asset_type, "author_photo")
+        self.assertEqual(result.author_name, "Jane Doe")
+        self.assertTrue(Path(result.local_path).exists())
         
-        # Original quality should return None (no resizing)
-        self.assertIsNone(self.manager._get_target_size(AssetQuality.ORIGINAL))
+        # Author thumbnails are cropped square
+        with Image.open(self.assets_dir / "thumbnails" / "author_thumb_Jane Doe.jpeg") as image:
+            self.assertEqual(image.width, image.height)
     
-    def test_cache_stats(self):
-        """Test cache statistics generation."""
-        # Add test assets
-        for i in range(3):
-            asset = AssetMetadata(
-                asset_id=f"test{i}",
-                asset_type=AssetType.COVER_IMAGE,
-                source_url=f"https://example.com/cover{i}.jpg",
-                local_path=str(self.test_image_path)
-            )
-            self.manager._add_to_registry(f"book{i}", "book", asset)
-        
-        stats = self.manager.get_cache_stats()
+    def test_get_asset_by_book_id(self):
+        """Test asset lookup by book."""
+        asset = self.manager.download_cover_image("https://example.com/cover.jpg", "book123", "Test Book")
         
-        self.assertEqual(stats['total_assets'], 3)
-        self.assertGreater(stats['total_size_mb'], 0)
-        self.assertEqual(stats['asset_type_counts']['cover_image'], 3)
-        self.assertEqual(stats['registry_entities'], 3)
-    
-    async def test_optimization_creation(self):
-        """Test creation of optimized image versions."""
-        # Create original asset
-        asset = AssetMetadata(
-            asset_id="test123",
-            asset_type=AssetType.COVER_IMAGE,
-            source_url="https://example.com/cover.jpg",
-            local_path=str(self.test_image_path)
+        self.assertEqual(self.manager.get_asset_by_book_id("book123"), asset)
+        self.assertIsNone(self.manager.get_asset_by_book_id("book123", "author_photo"))
+        self.assertIsNone(self.manager.get_asset_by_book_id("nonexistent"))
+    
+    def test_cache_persistence(self):
+        """Test cached assets and relationships survive a reopen."""
+        asset = self.manager.download_cover_image("https://example.com/cover.jpg", "book123", "Test Book")
+        self.manager.detect_book_relationships([
+            {'id': 'b1', 'title': 'Dune', 'authors': ['Frank Herbert']},
+            {'id': 'b2', 'title': 'Dune Messiah', 'authors': ['Frank Herbert']},
+        ])
+        self.manager.close()
+        
+        new_manager = VisualAssetManager(assets_dir=str(self.assets_dir))
+        self.addCleanup(new_manager.close)
+        
+        self.assertEqual(new_manager.get_asset_by_book_id("book123"), asset)
+        self.assertEqual(len(new_manager.relationships), 1)
+        self.assertEqual(new_manager.relationships, self.manager.relationships)
+    
+    def test_unclosed_manager_keeps_pending_writes(self):
+        """Test a manager dropped without close() still saves its buffered writes."""
+        manager = VisualAssetManager(assets_dir=str(self.assets_dir))
+        manager.download_delay = 0
+        asset = manager.download_cover_image("https://example.com/cover.jpg", "book123", "Test Book")
+        manager.detect_book_relationships([
+            {'id': 'b1', 'title': 'Dune', 'authors': ['Frank Herbert']},
+            {'id': 'b2', 'title': 'Dune Messiah', 'authors': ['Frank Herbert']},
+        ])
+        
+        # The exit-time flush must not keep the manager alive either
+        manager_ref = weakref.ref(manager)
+        del manager
+        gc.collect()
+        self.assertIsNone(manager_ref())
+        
+        reopened = VisualAssetManager(assets_dir=str(self.assets_dir))
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.get_asset_by_book_id("book123"), asset)
+        self.assertEqual(len(reopened.relationships), 1)
+    
+    def test_legacy_json_cache_import(self):
+        """Test an asset_cache.json from before the sqlite store is imported once."""
+        path = self._write_image("legacy.jpg")
+        legacy = {
+            'old-md5-key': {
+                'id': 'old-md5-key', 'url': "https://example.com/legacy.jpg", 'local_path': str(path),
+                'asset_type': 'cover', 'width': 400, 'height': 600, 'file_size': path.stat().st_size,
+                'format': 'JPEG', 'checksum': '', 'book_id': 'book9', 'author_name': None, 'publisher_name': None
+            }
+        }
+        other_dir = self.temp_dir / "legacy_assets"
+        other_dir.mkdir()
+        (other_dir / "asset_cache.json").write_text(json.dumps(legacy))
+        
+        manager = VisualAssetManager(assets_dir=str(other_dir))
+        self.addCleanup(manager.close)
+        
+        asset = manager.get_asset_by_book_id("book9")
+        self.assertEqual(asset.id, manager._generate_asset_id("https://example.com/legacy.jpg"))
+        self.assertEqual(asset.local_path, str(path))
+        self.assertFalse((other_dir / "asset_cache.json").exists())
+        self.assertTrue((other_dir / "asset_cache.json.migrated").exists())
+    
+    def test_optimize_image(self):
+        """Test oversized images are shrunk and their record updated."""
+        path = self._write_image("large.jpg", size=(1600, 2400))
+        asset = VisualAsset(
+            id="test123", url="https://example.com/large.jpg", local_path=str(path), asset_type="cover",
+            width=1600, height=2400, file_size=path.stat().st_size, format="JPEG", checksum=""
         )
         
-        # Generate optimized versions
-        await self.manager._generate_optimized_versions(asset)
+        self.assertTrue(self.manager.optimize_image(asset))
         
-        # Check if optimized versions were created
-        for quality in [AssetQuality.THUMBNAIL, AssetQuality.SMALL, AssetQuality.MEDIUM]:
-            optimized_path = self.manager._get_asset_path(
-                asset.asset_id, 
-                asset.asset_type, 
-                quality
-            )
+        with Image.open(path) as image:
+            self.assertLessEqual(image.width, 800)
+            self.assertLessEqual(image.height, 1200)
+            self.assertEqual((asset.width, asset.height), image.size)
+        self.assertEqual(asset.file_size, path.stat().st_size)
+        self.assertEqual(asset.checksum, hashlib.sha256(path.read_bytes()).hexdigest())
+    
+    def test_download_after_optimize_does_not_link_to_optimized_file(self):
+        """Test optimizing a cover drops its original checksum from the hard-link index."""
+        buffer = io.BytesIO()
+        Image.new('RGB', (1600, 2400), color='green').save(buffer, 'JPEG')
+        body = buffer.getvalue()
+        
+        def get(*args, **kwargs):
+            return _FakeResponse(body)
+        
+        with patch.object(self.manager.session, 'get', side_effect=get) as mock_get:
+            original = self.manager.download_cover_image("https://example.com/a.jpg", "book1", "Book One")
+            self.assertTrue(self.manager.optimize_image(original))
             
-            # Note: This test might fail if PIL is not available
-            # In a real environment, the optimized files should exist
-            # For now, we just check that the method doesn't crash
-        
-        # Test should complete without errors
-        self.assertTrue(True)
-
-
-class TestConvenienceFunctions(unittest.IsolatedAsyncioTestCase):
-    """Test convenience functions."""
-    
-    async def asyncSetUp(self):
-        """Set up test environment."""
-        self.temp_dir = tempfile.mkdtemp()
-        self.cache_dir = Path(self.temp_dir) / "assets"
-        self.manager = VisualAssetManager(cache_dir=self.cache_dir)
-        
-        # Create test image
-        self.test_image_path = Path(self.temp_dir) / "test_image.jpg"
-        img = Image.new('RGB', (300, 400), color='red')
-        img.save(self.test_image_path, 'JPEG')
-    
-    async def asyncTearDown(self):
-        """Clean up test environment."""
-        import shutil
-        shutil.rmtree(self.temp_dir, ignore_errors=True)
-    
-    async def test_download_book_cover(self):
-        """Test book cover download convenience function."""
-        url = "https://example.com/cover.jpg"
-        book_id = "book123"
-        
-        # Mock HTTP response
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.read.return_value = self.test_image_path.read_bytes()
+            # Same bytes under another URL: stored as downloaded, then served from the cache
+            copy = self.manager.download_cover_image("https://example.com/b.jpg", "book2", "Book Two")
+            self.assertEqual(self.manager.download_cover_image("https://example.com/b.jpg", "book2", "Book Two"), copy)
+        
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(Path(copy.local_path).read_bytes(), body)
+        self.assertEqual(copy.checksum, hashlib.sha256(body).hexdigest())
+        self.assertNotEqual(Path(original.local_path).read_bytes(), body)
+    
+    def test_optimize_png_cover_converts_to_jpeg(self):
+        """Test oversized PNG covers are re-encoded as JPEG."""
+        path = self._write_image("large.png", size=(1600, 2400), image_format='PNG')
+        asset = VisualAsset(
+            id="test123", url="https://example.com/large.png", local_path=str(path), asset_type="cover",
+            width=1600, height=2400, file_size=path.stat().st_size, format="PNG", checksum=""
+        )
         
-        with patch('aiohttp.ClientSession.get') as mock_get:
-            mock_get.return_value.__aenter__.return_value = mock_response
-            
-            async with self.manager:
-                result = await download_book_cover(self.manager, url, book_id)
+        self.assertTrue(self.manager.optimize_image(asset))
         
-        self.assertIsNotNone(result)
-        self.assertEqual(result.asset_type, AssetType.COVER_IMAGE)
-        self.assertEqual(result.source_url, url)
+        self.assertFalse(path.exists())
+        self.assertEqual(asset.format, "JPEG")
+        self.assertTrue(Path(asset.local_path).exists())
+        self.assertEqual(Path(asset.local_path).suffix, ".jpg")
     
-    async def test_download_author_photo(self):
-        """Test author photo download convenience function."""
-        url = "https://example.com/author.jpg"
-        author_id = "author123"
+    def test_detect_book_relationships(self):
+        """Test relationship detection between books."""
+        books = [
+            {'id': 'b1', 'title': 'The Dark Tower Volume 1', 'authors': ['Stephen King']},
+            {'id': 'b2', 'title': 'The Dark Tower Volume 2', 'authors': ['Stephen King']},
+            {'id': 'b3', 'title': 'Gardening Basics', 'authors': ['Someone Else']},
+        ]
         
-        # Mock HTTP response
-        mock_response = AsyncMock()
-        mock_response.status = 200
-        mock_response.read.return_value = self.test_image_path.read_bytes()
+        relationships = self.manager.detect_book_relationships(books)
         
-        with patch('aiohttp.ClientSession.get') as mock_get:
-            mock_get.return_value.__aenter__.return_value = mock_response
-            
-            async with self.manager:
-                result = await download_author_photo(self.manager, url, author_id)
+        self.assertEqual(len(relationships), 1)
+        self.assertIsInstance(relationships[0], BookRelationship)
+        self.assertEqual((relationships[0].book_id, relationships[0].related_book_id), ('b1', 'b2'))
+        self.assertEqual(self.manager.get_relationships_for_book('b2'), relationships)
+        self.assertEqual(self.manager.get_relationships_for_book('b3'), [])
+    
+    def test_cleanup_orphaned_assets(self):
+        """Test assets of removed books are deleted."""
+        kept = self.manager.download_cover_image("https://example.com/a.jpg", "book1", "Kept")
+        with patch.object(self.manager.session, 'get',
+                          return_value=_FakeResponse(_TEST_JPEG_BYTES + b"\0")):
+            orphan = self.manager.download_cover_image("https://example.com/b.jpg", "book2", "Orphan")
+        
+        self.assertEqual(self.manager.cleanup_orphaned_assets(["book1"]), 1)
+        
+        self.assertFalse(Path(orphan.local_path).exists())
+        self.assertTrue(Path(kept.local_path).exists())
+        self.assertIsNone(self.manager.get_asset_by_book_id("book2"))
+        self.assertEqual(list(self.manager.asset_cache), [kept.id])
+    
+    def test_storage_stats(self):
+        """Test storage statistics generation."""
+        self.manager.download_cover_image("https://example.com/cover.jpg", "book123", "Test Book")
         
-        self.assertIsNotNone(result)
-        self.assertEqual(result.asset_type, AssetType.AUTHOR_PHOTO)
-        self.assertEqual(result.source_url, url)
-    
-    def test_get_book_cover_path(self):
-        """Test book cover path retrieval convenience function."""
-        # Add test asset to manager
-        asset = AssetMetadata(
-            asset_id="test123",
-            asset_type=AssetType.COVER_IMAGE,
-            source_url="https://example.com/cover.jpg",
-            local_path=str(self.test_image_path)
-        )
-        self.manager._add_to_registry("book123", "book", asset)
+        stats = self.manager.get_storage_stats()
         
-        # Get cover path
-        path = get_book_cover_path(self.manager, "book123", AssetQuality.MEDIUM)
-        self.assertIsNotNone(path)
+        self.assertEqual(stats['cached_assets'], 1)
+        self.assertEqual(stats['file_count'], 2)  # Original and thumbnail
+        self.assertGreater(stats['total_size_mb'], 0)
+        self.assertEqual(stats['relationships'], 0)
 
 
 if __name__ == '__main__':
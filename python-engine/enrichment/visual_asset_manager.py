@@ -1,16 +1,268 @@
+import asyncio
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import hashlib
 import os
-from PIL import Image, ImageOps
+import platform
+import queue
+import re
+import shutil
+import sys
+import tempfile
+import threading
+from collections import defaultdict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+import PIL
+from PIL import Image, ImageCms, ImageOps, features
 import io
 import logging
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from typing import AbstractSet, Dict, FrozenSet, List, Optional, Set, Tuple, Union
+from dataclasses import asdict, dataclass
 from pathlib import Path
+from urllib.parse import urlsplit
 import json
+import mmap
+import multiprocessing
+import sqlite3
 import time
+import weakref
 
-@dataclass
+try:
+    import pyvips
+    HAS_PYVIPS = True
+except (ImportError, OSError):
+    HAS_PYVIPS = False
+    pyvips = None
+
+try:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    HAS_SKLEARN = True
+except ImportError:
+    HAS_SKLEARN = False
+    np = None
+    TfidfVectorizer = None
+
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbojpeg = TurboJPEG()
+    HAS_TURBOJPEG = True
+except (ImportError, OSError, RuntimeError):
+    HAS_TURBOJPEG = False
+    _turbojpeg = None
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+    orjson = None
+
+# JPEG encode/decode is 2-7x faster when Pillow links libjpeg-turbo
+HAS_LIBJPEG_TURBO = bool(features.check_feature('libjpeg_turbo'))
+
+# Pillow-SIMD (versioned like "9.5.0.post1") vectorizes resampling with
+# SSE4/AVX2; it only exists for x86-64, so stock Pillow is expected elsewhere
+HAS_PILLOW_SIMD = '.post' in PIL.__version__
+_SIMD_CAPABLE = platform.machine().lower() in ('x86_64', 'amd64')
+
+# Stock Pillow is the common case, so note the slower build once, at debug level
+if not HAS_LIBJPEG_TURBO:
+    logging.getLogger(__name__).debug("Pillow is not linked against libjpeg-turbo; JPEG processing will be slower")
+if _SIMD_CAPABLE and not HAS_PILLOW_SIMD:
+    logging.getLogger(__name__).debug("Pillow-SIMD not installed; thumbnail resizing will use the scalar Pillow kernels")
+
+# Storage subdirectory for each asset_type, plus the shared thumbnail directory
+_SUBDIR_MAP = {
+    'cover': 'covers',
+    'author_photo': 'authors',
+    'publisher_logo': 'publishers',
+}
+_THUMBNAILS = 'thumbnails'
+
+# Target profile when baking embedded ICC profiles into stripped outputs
+_SRGB_PROFILE = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB'))
+
+# Volume/part markers used to spot books from the same series
+_VOLUME_PATTERNS = [re.compile(pattern) for pattern in (
+    r'volume\s+(\d+)',
+    r'vol\.\s*(\d+)',
+    r'book\s+(\d+)',
+    r'part\s+(\d+)',
+    r'#(\d+)',
+)]
+
+# Images are already compressed, so ask servers not to gzip them again
+_DOWNLOAD_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+    'Accept-Encoding': 'identity',
+}
+
+# A downloaded body: bytes in memory, or the partial file it was streamed to
+_ImageSource = Union[bytes, Path]
+
+# Bytes per read when streaming a download to disk
+_STREAM_CHUNK_SIZE = 1 << 20
+
+def _default_file_mode() -> int:
+    """Mode open() gives a new file under the process umask (umask can only be read by setting it)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+# mkstemp creates files as 0600; downloads are widened to this before they are moved into place
+_FILE_MODE = _default_file_mode()
+
+def _create_thumbnail(image: Image.Image, size: Tuple[int, int], crop_to_square: bool,
+                      resampling_filter: Image.Resampling) -> Image.Image:
+    """Create optimized thumbnail, shrinking the decoded image in place"""
+    # Let JPEGs decode straight from the DCT at 1/2-1/8 scale, keeping 2x
+    # headroom so the final resample still has pixels to filter
+    image.draft(None, (size[0] * 2, size[1] * 2))
+
+    if crop_to_square:
+        # Crop and resize in a single resample instead of copying the crop
+        min_dimension = min(image.width, image.height)
+        left = (image.width - min_dimension) // 2
+        top = (image.height - min_dimension) // 2
+        right = left + min_dimension
+        bottom = top + min_dimension
+        side = min(min_dimension, size[0], size[1])
+        image = image.resize((side, side), resampling_filter,
+                             box=(left, top, right, bottom), reducing_gap=2.0)
+    else:
+        # Resize maintaining aspect ratio; reducing_gap box-reduces to ~2x
+        # the target before the final resample
+        image.thumbnail(size, resampling_filter, reducing_gap=2.0)
+
+    # Convert to RGB if necessary
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+        image = background
+
+    return image
+
+def _strip_metadata(image: Image.Image) -> Image.Image:
+    """Drop EXIF/XMP and bake any embedded ICC profile into sRGB before saving"""
+    icc_profile = image.info.get('icc_profile')
+    if icc_profile:
+        if image.mode != 'RGB':
+            return image  # Keep the profile rather than shift colours
+        try:
+            source_profile = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+            image = ImageCms.profileToProfile(image, source_profile, _SRGB_PROFILE, outputMode='RGB')
+        except ImageCms.PyCMSError as e:
+            logging.getLogger(__name__).warning(f"Keeping embedded ICC profile, conversion failed: {e}")
+            return image
+
+    # Untagged images are assumed sRGB and need no conversion
+    for key in ('exif', 'icc_profile', 'xmp'):
+        image.info.pop(key, None)
+    return image
+
+def _open_image(source: _ImageSource) -> Image.Image:
+    """Lazily open an image held in memory or in a file"""
+    return Image.open(source if isinstance(source, Path) else io.BytesIO(source))
+
+def _turbo_decode(source: _ImageSource, image_size: Tuple[int, int], size: Tuple[int, int]) -> Image.Image:
+    """Decode a JPEG with libjpeg-turbo, DCT-scaled like Image.draft to 2x the target"""
+    # Smallest scale that still leaves 2x headroom, as draft() would pick
+    target = (size[0] * 2, size[1] * 2)
+    num, denom = min(
+        (factor for factor in _turbojpeg.scaling_factors
+         if factor[0] <= factor[1]
+         and -(-image_size[0] * factor[0] // factor[1]) >= target[0]
+         and -(-image_size[1] * factor[0] // factor[1]) >= target[1]),
+        key=lambda factor: factor[0] / factor[1],
+        default=(1, 1)
+    )
+    data = source.read_bytes() if isinstance(source, Path) else source
+    return Image.fromarray(_turbojpeg.decode(data, pixel_format=TJPF_RGB, scaling_factor=(num, denom)))
+
+def _render_thumbnail(source: _ImageSource, size: Tuple[int, int], thumbnail_path: Path, crop_to_square: bool,
+                      use_vips: bool, resampling_filter: Image.Resampling,
+                      image: Optional[Image.Image] = None):
+    """Decode, resize and write one thumbnail
+
+    Kept at module level and driven by picklable arguments so it can run in a
+    ProcessPoolExecutor worker.
+    """
+    if use_vips:
+        try:
+            options = {'height': size[1], 'size': 'down', 'export_profile': 'srgb',
+                       'crop': 'centre' if crop_to_square else 'none'}
+            if isinstance(source, Path):
+                thumbnail = pyvips.Image.thumbnail(str(source), size[0], **options)
+            else:
+                thumbnail = pyvips.Image.thumbnail_buffer(source, size[0], **options)
+            if thumbnail.hasalpha():
+                thumbnail = thumbnail.flatten(background=[255, 255, 255])
+
+            options = {'strip': True}
+            if thumbnail_path.suffix.lower() in ('.jpg', '.jpeg', '.webp'):
+                options['Q'] = 85
+            thumbnail.write_to_file(str(thumbnail_path), **options)
+            return
+        except pyvips.Error as e:
+            logging.getLogger(__name__).warning(f"libvips thumbnail failed, falling back to Pillow: {e}")
+
+    if image is None:
+        with _open_image(source) as image:
+            _render_pillow_thumbnail(source, image, size, thumbnail_path, crop_to_square, resampling_filter)
+    else:
+        _render_pillow_thumbnail(source, image, size, thumbnail_path, crop_to_square, resampling_filter)
+
+def _render_pillow_thumbnail(source: _ImageSource, image: Image.Image, size: Tuple[int, int], thumbnail_path: Path,
+                             crop_to_square: bool, resampling_filter: Image.Resampling):
+    """Pillow thumbnail of an opened image, decoding plain RGB JPEGs with libjpeg-turbo when available"""
+    if HAS_TURBOJPEG and image.format == 'JPEG' and image.mode == 'RGB' and 'icc_profile' not in image.info:
+        image = _turbo_decode(source, image.size, size)
+    thumbnail = _create_thumbnail(image, size, crop_to_square, resampling_filter)
+    thumbnail = _strip_metadata(thumbnail)
+    thumbnail.save(thumbnail_path, optimize=True, quality=85)
+
+def _json_dumps(obj) -> bytes:
+    """Compact JSON encoding, using orjson when it is installed"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+def _json_loads(data):
+    """Decode JSON from str or bytes, using orjson when it is installed"""
+    return orjson.loads(data) if HAS_ORJSON else json.loads(data)
+
+# Files counted by get_storage_stats
+_IMAGE_SUFFIXES = frozenset({'.jpg', '.jpeg', '.png', '.gif', '.webp'})
+
+# Words ignored when comparing titles, and punctuation dropped before splitting
+_STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'})
+_TITLE_PUNCTUATION = str.maketrans('', '', '.,!?;:"()[]{}')
+
+# Title token ids plus, per matching volume pattern, the base title's token ids
+_TitleProfile = Tuple[FrozenSet[int], Dict[int, FrozenSet[int]]]
+
+# Items buffered between download_covers_batch pipeline stages
+_PIPELINE_DEPTH = 64
+
+# Batches with fewer covers to fetch render thumbnails in-process, below the cost of a worker pool
+_INLINE_RENDER_JOBS = 4
+
+# Render workers start from a clean interpreter: forking the threaded pipeline could copy held locks
+_RENDER_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+# Seconds before a cached file whose size and mtime are unchanged is re-hashed anyway
+_REVERIFY_INTERVAL = 24 * 60 * 60
+
+# Records are kept by the thousand; __slots__ drops the per-instance dict (3.10+)
+_RECORD_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_RECORD_OPTIONS)
 class VisualAsset:
     id: str
     url: str
@@ -25,7 +277,7 @@ class VisualAsset:
     author_name: Optional[str] = None
     publisher_name: Optional[str] = None
 
-@dataclass
+@dataclass(**_RECORD_OPTIONS)
 class BookRelationship:
     book_id: str
     related_book_id: str
@@ -33,28 +285,186 @@ class BookRelationship:
     confidence: float
     metadata: Dict
 
+class _HashingReader:
+    """File-like wrapper that hashes everything read through it"""
+    
+    def __init__(self, source, hasher):
+        self.source = source
+        self.hasher = hasher
+        
+    def read(self, size: int = -1) -> bytes:
+        data = self.source.read(size)
+        self.hasher.update(data)
+        return data
+
+@dataclass
+class _CoverJob:
+    """A cover moving through the download_covers_batch pipeline"""
+    index: int
+    url: str
+    url_hash: str
+    book_id: str
+    book_title: str
+    checksum: str = ''
+    part_path: Optional[Path] = None
+    dimensions: Tuple[int, int] = (0, 0)
+    image_format: str = ''
+    filename: str = ''
+    render: Optional[Future] = None
+    error: Optional[Exception] = None
+
+def _asset_row(url_hash: str, asset_data: Dict) -> Tuple:
+    """Flatten a cache entry into an assets table row"""
+    return (url_hash, asset_data.get('book_id'), asset_data.get('asset_type'), _json_dumps(asset_data))
+
+def _write_asset_rows(db: sqlite3.Connection, cache: Dict, replace_all: bool = False):
+    """Write cache entries in one transaction"""
+    with db:
+        db.execute("BEGIN")
+        if replace_all:
+            db.execute("DELETE FROM assets")
+        db.executemany(
+            "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+            (_asset_row(url_hash, asset_data) for url_hash, asset_data in cache.items())
+        )
+
+def _insert_relationships(db: sqlite3.Connection, relationships: List[BookRelationship]):
+    """Append relationships to the database in one transaction"""
+    with db:
+        db.execute("BEGIN")
+        db.executemany(
+            "INSERT INTO relationships VALUES (?, ?, ?, ?, ?)",
+            ((rel.book_id, rel.related_book_id, rel.relationship_type, rel.confidence, _json_dumps(rel.metadata))
+             for rel in relationships)
+        )
+
+def _flush_pending(db: sqlite3.Connection, cache_lock: threading.RLock, asset_cache: Dict,
+                   dirty_assets: Set[str], pending_relationships: List[BookRelationship]):
+    """Write buffered asset rows and relationships, emptying the buffers that were saved"""
+    with cache_lock:
+        if dirty_assets:
+            try:
+                _write_asset_rows(db, {
+                    url_hash: asset_cache[url_hash]
+                    for url_hash in dirty_assets if url_hash in asset_cache
+                })
+                dirty_assets.clear()
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Failed to save asset cache: {e}")
+        if pending_relationships:
+            try:
+                _insert_relationships(db, pending_relationships)
+                pending_relationships.clear()
+            except Exception as e:
+                logging.getLogger(__name__).error(f"Failed to save relationships: {e}")
+
+def _release_manager(session: requests.Session, db: sqlite3.Connection,
+                     render_pools: Dict[int, ProcessPoolExecutor], *buffers):
+    """Flush a manager's buffers, close its connections and stop its render workers
+    
+    Run by weakref.finalize on close(), on garbage collection or at exit, so it
+    must not reference the manager itself.
+    """
+    _flush_pending(db, *buffers)
+    session.close()
+    db.close()
+    for pool in render_pools.values():
+        pool.shutdown()
+    render_pools.clear()
+
+class _InlineExecutor(Executor):
+    """Executor running each call in the submitting thread"""
+    
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
 class VisualAssetManager:
-    def __init__(self, assets_dir: str = "assets"):
+    def __init__(self, assets_dir: str = "assets", use_vips: bool = True, use_tfidf: bool = False,
+                 resampling_filter: Image.Resampling = Image.Resampling.LANCZOS):
         self.assets_dir = Path(assets_dir)
         self.assets_dir.mkdir(exist_ok=True)
         
-        # Create subdirectories
-        (self.assets_dir / "covers").mkdir(exist_ok=True)
-        (self.assets_dir / "authors").mkdir(exist_ok=True)
-        (self.assets_dir / "publishers").mkdir(exist_ok=True)
-        (self.assets_dir / "thumbnails").mkdir(exist_ok=True)
+        # Create subdirectories once and keep their paths for the download paths
+        self.asset_dirs = {asset_type: self.assets_dir / subdir for asset_type, subdir in _SUBDIR_MAP.items()}
+        self.thumbnails_dir = self.assets_dir / _THUMBNAILS
+        for directory in (*self.asset_dirs.values(), self.thumbnails_dir):
+            directory.mkdir(exist_ok=True)
         
         self.logger = logging.getLogger(__name__)
+        
         self.cache_file = self.assets_dir / "asset_cache.json"
+        self.db_path = self.assets_dir / "assets.db"
         self.relationships_file = self.assets_dir / "relationships.json"
         
+        # Asset index lives in sqlite so each download is a single-row upsert
+        self._cache_lock = threading.RLock()
+        self.db = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        self._init_database()
+        
+        # Cache writes are buffered and flushed every _flush_interval changes, on
+        # close()/exit of a with-block, and when the manager is collected or the
+        # interpreter exits (the finalizer registered below)
+        self._dirty_assets: Set[str] = set()
+        self._pending_relationships: List[BookRelationship] = []
+        self._flush_interval = 50
+        
         # Load existing cache
         self.asset_cache = self._load_cache()
+        self._migrate_cache_keys()
         self.relationships = self._load_relationships()
         
-        # Rate limiting
-        self.last_download_time = 0
-        self.download_delay = 0.5  # seconds between downloads
+        # url_hash -> ((size, mtime_ns, checksum), monotonic time) of the last full checksum match
+        self._verified_files: Dict[str, Tuple[Tuple[int, int, Optional[str]], float]] = {}
+        
+        # Identical downloads share one file on disk via hard links; the reverse map lets
+        # a rewritten or removed file drop its stale checksum entry
+        self._paths_by_checksum: Dict[str, str] = {}
+        self._checksums_by_path: Dict[str, str] = {}
+        for asset in self.asset_cache.values():
+            if asset.get('checksum'):
+                self._index_file(asset['checksum'], asset['local_path'])
+        
+        # (book_id, asset_type) -> url_hash, so book lookups skip the database
+        self._by_book_type = {}
+        for url_hash, asset_data in self.asset_cache.items():
+            self._index_asset(url_hash, asset_data)
+        
+        # Pooled keep-alive connections shared by all download threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=Retry(
+            total=3, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504)
+        ))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Thumbnail worker processes, kept across batches; keyed by worker count, with at
+        # most one entry, and held in a dict so the finalizer can shut it down
+        self._render_pools: Dict[int, ProcessPoolExecutor] = {}
+        self._render_pool_lock = threading.Lock()
+        self._finalizer = weakref.finalize(
+            self, _release_manager, self.session, self.db, self._render_pools, *self._flush_buffers()
+        )
+        
+        # Rate limiting, per host so different hosts download in parallel
+        self.download_delay = 0.5  # seconds between request starts to one host
+        self.max_per_host = 4  # concurrent requests to one host
+        self._rate_lock = threading.Lock()
+        self._next_request_time: Dict[str, float] = {}
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        
+        # libvips thumbnails shrink JPEGs on load instead of decoding full size
+        self.use_vips = use_vips and HAS_PYVIPS
+        
+        # BICUBIC resizes 2-3x faster than LANCZOS where quality matters less
+        self.resampling_filter = resampling_filter
+        
+        # Score title similarity as TF-IDF cosine instead of Jaccard
+        self.use_tfidf = use_tfidf and HAS_SKLEARN
         
     def download_cover_image(self, url: str, book_id: str, book_title: str) -> Optional[VisualAsset]:
         """Download and process book cover image"""
@@ -62,121 +472,132 @@ class VisualAssetManager:
             return None
             
         # Check if already cached
-        url_hash = hashlib.md5(url.encode()).hexdigest()
-        if url_hash in self.asset_cache:
-            cached_asset = self.asset_cache[url_hash]
-            if Path(cached_asset['local_path']).exists():
-                return VisualAsset(**cached_asset)
+        url_hash = self._generate_asset_id(url)
+        cached_asset = self._get_cached_asset(url_hash)
+        if cached_asset:
+            return cached_asset
                 
-        self._respect_rate_limit()
-        
+        part_path = None
         try:
-            response = requests.get(url, timeout=10, headers={
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            })
-            response.raise_for_status()
-            
-            # Process image
-            image_data = response.content
-            image = Image.open(io.BytesIO(image_data))
-            
-            # Generate filename
-            safe_title = "".join(c for c in book_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            safe_title = safe_title[:50]  # Limit length
-            filename = f"{book_id}_{safe_title}.{image.format.lower()}"
-            local_path = self.assets_dir / "covers" / filename
-            
-            # Save original
-            with open(local_path, 'wb') as f:
-                f.write(image_data)
-                
-            # Create thumbnail
-            thumbnail = self._create_thumbnail(image, (300, 400))
-            thumbnail_path = self.assets_dir / "thumbnails" / f"thumb_{filename}"
-            thumbnail.save(thumbnail_path, optimize=True, quality=85)
-            
-            # Calculate checksum
-            checksum = hashlib.md5(image_data).hexdigest()
-            
-            # Create asset record
-            asset = VisualAsset(
-                id=url_hash,
-                url=url,
-                local_path=str(local_path),
-                asset_type='cover',
-                width=image.width,
-                height=image.height,
-                file_size=len(image_data),
-                format=image.format,
-                checksum=checksum,
-                book_id=book_id
-            )
-            
-            # Cache the asset
-            self.asset_cache[url_hash] = asset.__dict__
-            self._save_cache()
-            
-            self.logger.info(f"Downloaded cover image for {book_title}")
-            return asset
+            part_path, checksum = self._fetch(url, self.asset_dirs['cover'])
+            return self._process_cover(url, url_hash, part_path, book_id, book_title, checksum=checksum)
             
         except Exception as e:
             self.logger.error(f"Failed to download cover image from {url}: {e}")
             return None
+        finally:
+            if part_path is not None:
+                part_path.unlink(missing_ok=True)
             
+    def _process_cover(self, url: str, url_hash: str, source: _ImageSource, book_id: str, book_title: str,
+                       checksum: Optional[str] = None) -> VisualAsset:
+        """Store a downloaded cover, its thumbnail and its cache record
+        
+        A body already streamed to disk is passed as its partial file, with its
+        checksum, and moved into place instead of being written again.
+        """
+        # Process image; it is closed before the source file is moved into place
+        with _open_image(source) as image:
+            width, height = image.size  # before the thumbnail shrinks it in place
+            image_format = image.format
+            filename = self._cover_filename(image, book_id, book_title)
+        
+            # Create thumbnail
+            self._save_thumbnail(source, image, (300, 400), self.thumbnails_dir / f"thumb_{filename}")
+        
+        return self._store_cover(url, url_hash, source, book_id, book_title, filename,
+                                 (width, height), image_format, checksum)
+        
+    def _cover_filename(self, image: Image.Image, book_id: str, book_title: str) -> str:
+        """Build the on-disk name for a cover from its book and decoded format"""
+        safe_title = "".join(c for c in book_title if c.isalnum() or c in (' ', '-', '_')).rstrip()
+        safe_title = safe_title[:50]  # Limit length
+        return f"{book_id}_{safe_title}.{image.format.lower()}"
+        
+    def _store_cover(self, url: str, url_hash: str, source: _ImageSource, book_id: str, book_title: str,
+                     filename: str, dimensions: Tuple[int, int], image_format: str,
+                     checksum: Optional[str]) -> VisualAsset:
+        """Write the original cover and record it in the asset cache"""
+        local_path = self.asset_dirs['cover'] / filename
+        file_size = self._source_size(source)
+        
+        # Save original, sharing the file with any identical download
+        if checksum is None:
+            checksum = self._calculate_checksum(source)
+        self._write_asset_file(local_path, source, checksum)
+        
+        # Create asset record
+        asset = VisualAsset(
+            id=url_hash,
+            url=url,
+            local_path=str(local_path),
+            asset_type='cover',
+            width=dimensions[0],
+            height=dimensions[1],
+            file_size=file_size,
+            format=image_format,
+            checksum=checksum,
+            book_id=book_id
+        )
+        
+        # Cache the asset
+        with self._cache_lock:
+            self.asset_cache[url_hash] = asdict(asset)
+            self._index_file(checksum, str(local_path))
+            self._save_asset(url_hash)
+        
+        self.logger.info(f"Downloaded cover image for {book_title}")
+        return asset
+        
     def download_author_photo(self, url: str, author_name: str) -> Optional[VisualAsset]:
         """Download and process author photo"""
         if not url:
             return None
             
-        url_hash = hashlib.md5(url.encode()).hexdigest()
-        if url_hash in self.asset_cache:
-            cached_asset = self.asset_cache[url_hash]
-            if Path(cached_asset['local_path']).exists():
-                return VisualAsset(**cached_asset)
+        url_hash = self._generate_asset_id(url)
+        cached_asset = self._get_cached_asset(url_hash)
+        if cached_asset:
+            return cached_asset
                 
-        self._respect_rate_limit()
-        
+        part_path = None
         try:
-            response = requests.get(url, timeout=10, headers={
-                'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-            })
-            response.raise_for_status()
+            part_path, checksum = self._fetch(url, self.asset_dirs['author_photo'])
+            # Closed again before the partial file is moved into place
+            with _open_image(part_path) as image:
+                width, height = image.size  # before the thumbnail shrinks it in place
+                image_format = image.format
             
-            image_data = response.content
-            image = Image.open(io.BytesIO(image_data))
+                # Generate filename
+                safe_name = "".join(c for c in author_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
+                safe_name = safe_name[:50]
+                filename = f"{safe_name}.{image_format.lower()}"
+                local_path = self.asset_dirs['author_photo'] / filename
             
-            # Generate filename
-            safe_name = "".join(c for c in author_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-            safe_name = safe_name[:50]
-            filename = f"{safe_name}.{image.format.lower()}"
-            local_path = self.assets_dir / "authors" / filename
+                # Create thumbnail
+                thumbnail_path = self.thumbnails_dir / f"author_thumb_{filename}"
+                self._save_thumbnail(part_path, image, (150, 150), thumbnail_path, crop_to_square=True)
             
-            # Save image
-            with open(local_path, 'wb') as f:
-                f.write(image_data)
-                
-            # Create thumbnail
-            thumbnail = self._create_thumbnail(image, (150, 150), crop_to_square=True)
-            thumbnail_path = self.assets_dir / "thumbnails" / f"author_thumb_{filename}"
-            thumbnail.save(thumbnail_path, optimize=True, quality=85)
-            
-            checksum = hashlib.md5(image_data).hexdigest()
+            # Save image, sharing the file with any identical download
+            file_size = self._source_size(part_path)
+            self._write_asset_file(local_path, part_path, checksum)
             
             asset = VisualAsset(
                 id=url_hash,
                 url=url,
                 local_path=str(local_path),
                 asset_type='author_photo',
-                width=image.width,
-                height=image.height,
-                file_size=len(image_data),
-                format=image.format,
+                width=width,
+                height=height,
+                file_size=file_size,
+                format=image_format,
                 checksum=checksum,
                 author_name=author_name
             )
             
-            self.asset_cache[url_hash] = asset.__dict__
-            self._save_cache()
+            with self._cache_lock:
+                self.asset_cache[url_hash] = asdict(asset)
+                self._index_file(checksum, str(local_path))
+                self._save_asset(url_hash)
             
             self.logger.info(f"Downloaded author photo for {author_name}")
             return asset
@@ -184,30 +605,278 @@ class VisualAssetManager:
         except Exception as e:
             self.logger.error(f"Failed to download author photo from {url}: {e}")
             return None
+        finally:
+            if part_path is not None:
+                part_path.unlink(missing_ok=True)
+            
+    def _generate_asset_id(self, url: str) -> str:
+        """Generate the cache key for an asset URL"""
+        # BLAKE2b with a 16-byte digest keeps the 32-char hex key length of
+        # the old MD5 keys while hashing faster and avoiding FIPS warnings
+        return hashlib.blake2b(url.encode(), digest_size=16).hexdigest()
+        
+    def _save_thumbnail(self, source: _ImageSource, image: Image.Image, size: Tuple[int, int],
+                        thumbnail_path: Path, crop_to_square: bool = False):
+        """Write a thumbnail, using libvips when available and Pillow otherwise"""
+        _render_thumbnail(source, size, thumbnail_path, crop_to_square,
+                          self.use_vips, self.resampling_filter, image=image)
+        
+    def download_covers_batch(self, covers: List[Tuple[str, str, str]], max_workers: int = 8,
+                              cpu_workers: Optional[int] = None) -> List[Optional[VisualAsset]]:
+        """Download (url, book_id, book_title) covers through a pipeline, in input order
+        
+        Downloader threads feed fetched bodies to a pool of cpu_workers processes
+        (default: all cores but one) that render thumbnails, and a single writer
+        thread stores the originals and cache records. Bounded queues between the
+        stages keep decode hidden behind network latency without buffering the
+        whole batch in memory. The worker pool lives until close(); batches with
+        fewer than _INLINE_RENDER_JOBS covers to fetch render in this thread.
+        """
+        results: List[Optional[VisualAsset]] = [None] * len(covers)
+        jobs = []
+        for index, (url, book_id, book_title) in enumerate(covers):
+            if not url:
+                continue
+            url_hash = self._generate_asset_id(url)
+            results[index] = self._get_cached_asset(url_hash)
+            if results[index] is None:
+                jobs.append(_CoverJob(index, url, url_hash, book_id, book_title))
+                
+        if len(jobs) < _INLINE_RENDER_JOBS:
+            cpu_pool = _InlineExecutor()
+        else:
+            cpu_pool = self._render_pool(cpu_workers or max(1, (os.cpu_count() or 1) - 1))
+            
+        fetched = queue.Queue(maxsize=_PIPELINE_DEPTH)
+        rendered = queue.Queue(maxsize=_PIPELINE_DEPTH)
+        writer = threading.Thread(target=self._write_covers, args=(rendered, results), daemon=True)
+        writer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as io_pool:
+                for job in jobs:
+                    io_pool.submit(self._fetch_cover, job, fetched)
+                for _ in jobs:
+                    job = fetched.get()
+                    if job.error is None:
+                        self._submit_cover_render(job, cpu_pool)
+                    rendered.put(job)
+        finally:
+            rendered.put(None)  # Poison pill for the writer
+            writer.join()
+        return results
+        
+    def _render_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Return the thumbnail worker pool, restarting it only if the worker count changed"""
+        with self._render_pool_lock:
+            pool = self._render_pools.get(workers)
+            if pool is None:
+                for stale in self._render_pools.values():
+                    stale.shutdown()
+                self._render_pools.clear()
+                pool = self._render_pools[workers] = ProcessPoolExecutor(
+                    max_workers=workers, mp_context=_RENDER_CONTEXT
+                )
+            return pool
+            
+    def _fetch_cover(self, job: _CoverJob, fetched: queue.Queue):
+        """Downloader stage: stream one cover to disk and hand it to the decoder stage"""
+        try:
+            job.part_path, job.checksum = self._fetch(job.url, self.asset_dirs['cover'])
+        except Exception as e:
+            job.error = e
+        fetched.put(job)
+        
+    def _submit_cover_render(self, job: _CoverJob, cpu_pool: Executor):
+        """Decoder stage: read the cover header here and render its thumbnail in cpu_pool"""
+        try:
+            with _open_image(job.part_path) as image:
+                job.dimensions, job.image_format = image.size, image.format
+                job.filename = self._cover_filename(image, job.book_id, job.book_title)
+            # Only the file path and settings cross the process boundary
+            job.render = cpu_pool.submit(
+                _render_thumbnail, job.part_path, (300, 400), self.thumbnails_dir / f"thumb_{job.filename}",
+                False, self.use_vips, self.resampling_filter
+            )
+        except Exception as e:
+            job.error = e
+            
+    def _write_covers(self, rendered: queue.Queue, results: List[Optional[VisualAsset]]):
+        """Writer stage: store each rendered cover until the poison pill arrives"""
+        while (job := rendered.get()) is not None:
+            try:
+                if job.error is not None:
+                    raise job.error
+                job.render.result()
+                results[job.index] = self._store_cover(
+                    job.url, job.url_hash, job.part_path, job.book_id, job.book_title, job.filename,
+                    job.dimensions, job.image_format, job.checksum
+                )
+            except Exception as e:
+                self.logger.error(f"Failed to download cover image from {job.url}: {e}")
+            finally:
+                if job.part_path is not None:
+                    job.part_path.unlink(missing_ok=True)
+                    
+    def download_covers(self, covers: List[Tuple[str, str, str]]) -> List[Optional[VisualAsset]]:
+        """Download (url, book_id, book_title) covers, in input order"""
+        return self.download_covers_batch(covers)
+        
+    async def download_covers_async(self, covers: List[Tuple[str, str, str]],
+                                    max_concurrency: int = 32) -> List[Optional[VisualAsset]]:
+        """Awaitable download_covers_batch, run on a worker thread so the event loop stays free
+        
+        Downloads share the batch pipeline's streaming, retries, rate limit
+        and per-host cap; max_concurrency bounds the downloader threads.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.download_covers_batch, covers, max_concurrency)
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        
+    def close(self):
+        """Flush pending cache writes and release HTTP connections and the asset database"""
+        self._finalizer()
+        
+    def flush(self):
+        """Write buffered asset and relationship changes to disk"""
+        _flush_pending(self.db, *self._flush_buffers())
+        
+    def _flush_buffers(self) -> Tuple:
+        """The lock, cache and write buffers _flush_pending works on"""
+        return self._cache_lock, self.asset_cache, self._dirty_assets, self._pending_relationships
+        
+    def _fetch(self, url: str, directory: Path) -> Tuple[Path, str]:
+        """Stream a URL into a partial file in directory, hashing it as it arrives
+        
+        Returns the partial file, which the caller moves into place or deletes,
+        and its checksum. The body is never held in memory as a whole.
+        """
+        self._respect_rate_limit(url)
+        with self._host_slot(url):
+            with self.session.get(url, timeout=10, headers=_DOWNLOAD_HEADERS, stream=True) as response:
+                response.raise_for_status()
+                response.raw.decode_content = True
+                reader = _HashingReader(response.raw, self._new_checksum())
+                fd, part_name = tempfile.mkstemp(suffix='.part', dir=directory)
+                try:
+                    with os.fdopen(fd, 'wb') as f:
+                        shutil.copyfileobj(reader, f, _STREAM_CHUNK_SIZE)
+                    os.chmod(part_name, _FILE_MODE)
+                except BaseException:
+                    os.unlink(part_name)
+                    raise
+                    
+        return Path(part_name), reader.hasher.hexdigest()
+        
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Semaphore capping concurrent requests to the URL's host"""
+        host = urlsplit(url).netloc
+        with self._rate_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = self._host_slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        return slot
+        
+    def _get_cached_asset(self, url_hash: str) -> Optional[VisualAsset]:
+        """Return a cached asset whose file is still present and intact
+        
+        A hit normally costs one stat(); the file is only re-hashed when its
+        size or mtime changed since the last match, or every _REVERIFY_INTERVAL.
+        """
+        cached_asset = self.asset_cache.get(url_hash)
+        if not cached_asset:
+            return None
+            
+        path, checksum = cached_asset['local_path'], cached_asset.get('checksum')
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self._verified_files.pop(url_hash, None)
+            return None
+            
+        signature = (stat.st_size, stat.st_mtime_ns, checksum)
+        verified = self._verified_files.get(url_hash)
+        now = time.monotonic()
+        if verified is None or verified[0] != signature or now - verified[1] >= _REVERIFY_INTERVAL:
+            if not self._verify_checksum(path, checksum):
+                self._verified_files.pop(url_hash, None)
+                return None
+            self._verified_files[url_hash] = (signature, now)
+        return VisualAsset(**cached_asset)
+        
+    def _verify_checksum(self, path: str, expected: Optional[str]) -> bool:
+        """Check a stored file against its recorded checksum without reading it into memory"""
+        try:
+            with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if not expected:
+                    return True  # Nothing recorded to compare against
+                # Assets cached before the SHA-256 switch carry 32-char MD5 checksums
+                hasher = hashlib.md5 if len(expected) == 32 else hashlib.sha256
+                return hasher(mm).hexdigest() == expected
+        except (OSError, ValueError):
+            # Missing file, or an empty one that mmap refuses to map
+            return False
             
+    def _write_asset_file(self, local_path: Path, source: _ImageSource, checksum: str):
+        """Store an asset, hard-linking an already stored file with the same content
+        
+        A source already on disk is renamed into place rather than copied.
+        """
+        existing_path = self._paths_by_checksum.get(checksum)
+        if existing_path and existing_path != str(local_path) and os.path.exists(existing_path):
+            try:
+                local_path.unlink(missing_ok=True)
+                os.link(existing_path, local_path)
+                return
+            except OSError as e:
+                # e.g. a filesystem without hard links; fall back to a copy
+                self.logger.debug(f"Could not link {local_path} to {existing_path}: {e}")
+                
+        if isinstance(source, Path):
+            os.replace(source, local_path)
+        else:
+            with open(local_path, 'wb') as f:
+                f.write(source)
+            
+    def _index_file(self, checksum: str, path: str):
+        """Record path as a file holding content with this checksum, replacing what it held before"""
+        self._unindex_file(path)
+        self._paths_by_checksum[checksum] = path
+        self._checksums_by_path[path] = checksum
+        
+    def _unindex_file(self, path: str):
+        """Forget path as a hard-link source once its content changes or it is removed"""
+        checksum = self._checksums_by_path.pop(path, None)
+        if checksum is not None and self._paths_by_checksum.get(checksum) == path:
+            del self._paths_by_checksum[checksum]
+            
+    @staticmethod
+    def _source_size(source: _ImageSource) -> int:
+        """Size in bytes of a downloaded body"""
+        return source.stat().st_size if isinstance(source, Path) else len(source)
+            
+    def _calculate_checksum(self, data: bytes) -> str:
+        """Calculate the content checksum for a downloaded asset"""
+        return self._new_checksum(data).hexdigest()
+        
+    def _new_checksum(self, data: bytes = b''):
+        """Hash object for content checksums, for hashing streamed bodies"""
+        # OpenSSL's SHA-256 uses the SHA-NI/ARMv8 SHA extensions and runs
+        # ~2x faster than MD5 on current CPUs; its 64-char hex digest also
+        # can't be mistaken for a legacy 32-char MD5 checksum
+        return hashlib.sha256(data)
+        
     def _create_thumbnail(self, image: Image.Image, size: Tuple[int, int], crop_to_square: bool = False) -> Image.Image:
-        """Create optimized thumbnail"""
-        if crop_to_square:
-            # Crop to square first
-            min_dimension = min(image.width, image.height)
-            left = (image.width - min_dimension) // 2
-            top = (image.height - min_dimension) // 2
-            right = left + min_dimension
-            bottom = top + min_dimension
-            image = image.crop((left, top, right, bottom))
-            
-        # Resize maintaining aspect ratio
-        image.thumbnail(size, Image.Resampling.LANCZOS)
-        
-        # Convert to RGB if necessary
-        if image.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = background
-            
-        return image
+        """Create optimized thumbnail, shrinking the decoded image in place"""
+        return _create_thumbnail(image, size, crop_to_square, self.resampling_filter)
+        
+    def _strip_metadata(self, image: Image.Image) -> Image.Image:
+        """Drop EXIF/XMP and bake any embedded ICC profile into sRGB before saving"""
+        return _strip_metadata(image)
         
     def optimize_image(self, asset: VisualAsset, max_size: Tuple[int, int] = (800, 1200), quality: int = 85) -> bool:
         """Optimize existing image"""
@@ -216,38 +885,63 @@ class VisualAssetManager:
             if not image_path.exists():
                 return False
                 
-            image = Image.open(image_path)
+            with Image.open(image_path) as image:
+                source_format = image.format
             
-            # Check if optimization is needed
-            if image.width <= max_size[0] and image.height <= max_size[1]:
-                return True  # Already optimized
+                # Check if optimization is needed
+                if image.width <= max_size[0] and image.height <= max_size[1]:
+                    return True  # Already optimized
                 
-            # Resize if too large
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Save optimized version
-            if image.format == 'PNG' and asset.asset_type == 'cover':
-                # Convert PNG covers to JPEG for better compression
-                if image.mode in ('RGBA', 'LA', 'P'):
-                    background = Image.new('RGB', image.size, (255, 255, 255))
-                    if image.mode == 'P':
-                        image = image.convert('RGBA')
-                    background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-                    image = background
+                # Resize if too large
+                image.thumbnail(max_size, self.resampling_filter, reducing_gap=2.0)
+            
+                # Save optimized version
+                convert_to_jpeg = source_format == 'PNG' and asset.asset_type == 'cover'
+                if convert_to_jpeg:
+                    # Convert PNG covers to JPEG for better compression
+                    if image.mode in ('RGBA', 'LA', 'P'):
+                        background = Image.new('RGB', image.size, (255, 255, 255))
+                        if image.mode == 'P':
+                            image = image.convert('RGBA')
+                        background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+                        image = background
                     
-                # Change extension to jpg
-                new_path = image_path.with_suffix('.jpg')
-                image.save(new_path, 'JPEG', optimize=True, quality=quality)
+                    # Change extension to jpg
+                    new_path = image_path.with_suffix('.jpg')
+                    image = self._strip_metadata(image)
+                    image.save(new_path, 'JPEG', optimize=True, quality=quality)
                 
+                else:
+                    # Save beside and swap in, so files hard-linked to this one
+                    # by content dedup keep their original bytes
+                    image = self._strip_metadata(image)
+                    tmp_path = image_path.with_name(image_path.name + '.tmp')
+                    image.save(tmp_path, source_format, optimize=True, quality=quality)
+                optimized_size = image.size
+            
+            # The source is closed now; Windows refuses to remove or replace an open file
+            if convert_to_jpeg:
                 # Remove old PNG file
                 image_path.unlink()
                 
                 # Update asset record
                 asset.local_path = str(new_path)
                 asset.format = 'JPEG'
-                
             else:
-                image.save(image_path, optimize=True, quality=quality)
+                os.replace(tmp_path, image_path)
+                
+            # Keep the cached record, and so its checksum, in step with the new file
+            optimized_data = Path(asset.local_path).read_bytes()
+            asset.width, asset.height = optimized_size
+            asset.file_size = len(optimized_data)
+            asset.checksum = self._calculate_checksum(optimized_data)
+            with self._cache_lock:
+                # The original bytes no longer live at this path
+                self._unindex_file(str(image_path))
+                self._index_file(asset.checksum, asset.local_path)
+                if asset.id in self.asset_cache:
+                    self.asset_cache[asset.id] = asdict(asset)
+                    self._save_asset(asset.id)
                 
             self.logger.info(f"Optimized image: {asset.local_path}")
             return True
@@ -260,21 +954,83 @@ class VisualAssetManager:
         """Detect relationships between books"""
         relationships = []
         
-        for i, book1 in enumerate(books_metadata):
-            for book2 in books_metadata[i+1:]:
-                relationship = self._analyze_book_relationship(book1, book2)
-                if relationship:
-                    relationships.append(relationship)
+        # Tokenize every title once; comparisons then only intersect int sets
+        vocabulary = {}
+        profiles = [self._title_profile(book.get('title', ''), vocabulary) for book in books_metadata]
+        
+        # Only pairs that could score are analyzed instead of all N^2
+        pairs = self._candidate_pairs(books_metadata, profiles)
+        title_scores = self._tfidf_title_similarities(books_metadata, pairs) if self.use_tfidf else None
+        
+        for pair_index, (i, j) in enumerate(pairs):
+            title_similarity = title_scores[pair_index] if title_scores is not None else None
+            relationship = self._analyze_book_relationship(
+                books_metadata[i], books_metadata[j], title_similarity=title_similarity,
+                profile1=profiles[i], profile2=profiles[j]
+            )
+            if relationship:
+                relationships.append(relationship)
                     
         # Save relationships
         self.relationships.extend(relationships)
-        self._save_relationships()
+        self._pending_relationships.extend(relationships)
         
         return relationships
         
-    def _analyze_book_relationship(self, book1: Dict, book2: Dict) -> Optional[BookRelationship]:
-        """Analyze relationship between two books"""
+    def _candidate_pairs(self, books_metadata: List[Dict],
+                         profiles: List[_TitleProfile]) -> List[Tuple[int, int]]:
+        """Index pairs sharing an author, ISBN prefix, title word or series base word
+        
+        Every relationship _analyze_book_relationship can report needs at least
+        one of these in common, so blocking on them loses no results.
+        """
+        buckets = defaultdict(list)
+        for index, book in enumerate(books_metadata):
+            keys = {('author', author) for author in book.get('authors', [])}
+            isbn = book.get('isbn', '')
+            if isbn:
+                keys.add(('isbn', isbn[:10]))
+            title_tokens, series_bases = profiles[index]
+            keys.update(('title', word) for word in title_tokens)
+            for pattern_index, base_tokens in series_bases.items():
+                keys.update(('series', pattern_index, word) for word in base_tokens)
+            for key in keys:
+                buckets[key].append(index)
+                
+        pairs = set()
+        for indices in buckets.values():
+            for position, i in enumerate(indices):
+                for j in indices[position + 1:]:
+                    pairs.add((i, j))
+        return sorted(pairs)
+        
+    def _tfidf_title_similarities(self, books_metadata: List[Dict],
+                                  pairs: List[Tuple[int, int]]) -> Optional[List[float]]:
+        """TF-IDF cosine similarity of the titles of each candidate pair"""
+        if not pairs:
+            return []
+            
+        # Same tokens as the Jaccard path, so title blocking stays exact
+        vectorizer = TfidfVectorizer(analyzer=self._title_tokens)
+        try:
+            matrix = vectorizer.fit_transform([book.get('title', '').lower() for book in books_metadata])
+        except ValueError:
+            return None  # No title words at all; fall back to Jaccard
+            
+        # Rows are L2-normalized, so the row-wise dot product is the cosine
+        rows = np.fromiter((i for i, _ in pairs), dtype=np.intp, count=len(pairs))
+        cols = np.fromiter((j for _, j in pairs), dtype=np.intp, count=len(pairs))
+        return np.asarray(matrix[rows].multiply(matrix[cols]).sum(axis=1)).ravel().tolist()
+        
+    def _analyze_book_relationship(self, book1: Dict, book2: Dict, title_similarity: Optional[float] = None,
+                                   profile1: Optional[_TitleProfile] = None,
+                                   profile2: Optional[_TitleProfile] = None) -> Optional[BookRelationship]:
+        """Analyze relationship between two books, reusing precomputed title profiles if given"""
         relationships = []
+        if profile1 is None or profile2 is None:
+            vocabulary = {}
+            profile1 = self._title_profile(book1.get('title', ''), vocabulary)
+            profile2 = self._title_profile(book2.get('title', ''), vocabulary)
         
         # Same author relationship
         authors1 = set(book1.get('authors', []))
@@ -284,16 +1040,15 @@ class VisualAssetManager:
             relationships.append(('author', confidence))
             
         # Title similarity (possible translations/editions)
-        title1 = book1.get('title', '').lower()
-        title2 = book2.get('title', '').lower()
-        title_similarity = self._calculate_title_similarity(title1, title2)
+        if title_similarity is None:
+            title_similarity = self._jaccard(profile1[0], profile2[0])
         if title_similarity > 0.7:
             relationships.append(('edition', title_similarity))
         elif title_similarity > 0.5:
             relationships.append(('similar', title_similarity))
             
         # Series detection
-        if self._detect_series_relationship(book1, book2):
+        if self._detect_series_relationship(profile1, profile2):
             relationships.append(('series', 0.9))
             
         # ISBN relationship (different editions)
@@ -324,56 +1079,56 @@ class VisualAssetManager:
         if not title1 or not title2:
             return 0.0
             
-        # Remove common words and punctuation
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by'}
-        
-        words1 = set(word.strip('.,!?;:"()[]{}') for word in title1.split() if word.lower() not in stop_words)
-        words2 = set(word.strip('.,!?;:"()[]{}') for word in title2.split() if word.lower() not in stop_words)
+        return self._jaccard(self._title_tokens(title1), self._title_tokens(title2))
         
+    @staticmethod
+    def _jaccard(words1: AbstractSet, words2: AbstractSet) -> float:
+        """Jaccard similarity of two token sets; 0.0 if either is empty"""
         if not words1 or not words2:
             return 0.0
             
-        # Jaccard similarity
         intersection = len(words1 & words2)
         union = len(words1 | words2)
         
         return intersection / union if union > 0 else 0.0
         
-    def _detect_series_relationship(self, book1: Dict, book2: Dict) -> bool:
-        """Detect if books are part of the same series"""
-        title1 = book1.get('title', '').lower()
-        title2 = book2.get('title', '').lower()
-        
-        # Look for volume/book numbers
-        import re
-        volume_patterns = [
-            r'volume\s+(\d+)',
-            r'vol\.\s*(\d+)',
-            r'book\s+(\d+)',
-            r'part\s+(\d+)',
-            r'#(\d+)',
-        ]
+    def _title_profile(self, title: str, vocabulary: Dict[str, int]) -> _TitleProfile:
+        """Token ids of a title and of its base title under each matching volume pattern
         
-        for pattern in volume_patterns:
-            match1 = re.search(pattern, title1)
-            match2 = re.search(pattern, title2)
-            
-            if match1 and match2:
-                # Same series if base titles are similar and different volumes
-                base1 = re.sub(pattern, '', title1).strip()
-                base2 = re.sub(pattern, '', title2).strip()
+        Words are mapped to small ints through the shared vocabulary so the
+        pairwise set operations hash ints instead of strings.
+        """
+        title = title.lower()
+        series_bases = {
+            pattern_index: self._token_ids(pattern.sub('', title).strip(), vocabulary)
+            for pattern_index, pattern in enumerate(_VOLUME_PATTERNS) if pattern.search(title)
+        }
+        return self._token_ids(title, vocabulary), series_bases
+        
+    def _token_ids(self, title: str, vocabulary: Dict[str, int]) -> FrozenSet[int]:
+        """Title tokens as ids in vocabulary, adding unseen words"""
+        return frozenset(vocabulary.setdefault(word, len(vocabulary)) for word in self._title_tokens(title))
+        
+    def _title_tokens(self, title: str) -> Set[str]:
+        """Lowercased title words with common words and punctuation removed"""
+        return {word for word in title.lower().translate(_TITLE_PUNCTUATION).split() if word not in _STOP_WORDS}
+        
+    def _detect_series_relationship(self, profile1: _TitleProfile, profile2: _TitleProfile) -> bool:
+        """Detect if books are part of the same series"""
+        # Look for volume/book numbers both titles match
+        bases1, bases2 = profile1[1], profile2[1]
+        for pattern_index in bases1.keys() & bases2.keys():
+            # Same series if base titles are similar and different volumes
+            if self._jaccard(bases1[pattern_index], bases2[pattern_index]) > 0.8:
+                return True
                 
-                if self._calculate_title_similarity(base1, base2) > 0.8:
-                    return True
-                    
         return False
         
     def get_asset_by_book_id(self, book_id: str, asset_type: str = 'cover') -> Optional[VisualAsset]:
         """Get asset for a specific book"""
-        for asset_data in self.asset_cache.values():
-            if asset_data.get('book_id') == book_id and asset_data.get('asset_type') == asset_type:
-                return VisualAsset(**asset_data)
-        return None
+        with self._cache_lock:
+            url_hash = self._by_book_type.get((book_id, asset_type))
+            return VisualAsset(**self.asset_cache[url_hash]) if url_hash else None
         
     def get_relationships_for_book(self, book_id: str) -> List[BookRelationship]:
         """Get all relationships for a specific book"""
@@ -384,87 +1139,179 @@ class VisualAssetManager:
         
     def cleanup_orphaned_assets(self, valid_book_ids: List[str]) -> int:
         """Remove assets for books that no longer exist"""
-        removed_count = 0
-        
-        for asset_id, asset_data in list(self.asset_cache.items()):
-            book_id = asset_data.get('book_id')
-            if book_id and book_id not in valid_book_ids:
-                # Remove file
-                asset_path = Path(asset_data['local_path'])
-                if asset_path.exists():
-                    asset_path.unlink()
+        valid = set(valid_book_ids)
+        with self._cache_lock:
+            orphaned = [
+                asset_id for asset_id, asset_data in self.asset_cache.items()
+                if asset_data.get('book_id') and asset_data['book_id'] not in valid
+            ]
+            
+            for asset_id in orphaned:
+                asset_data = self.asset_cache.pop(asset_id)
+                self._verified_files.pop(asset_id, None)
+                key = (asset_data['book_id'], asset_data.get('asset_type'))
+                if self._by_book_type.get(key) == asset_id:
+                    del self._by_book_type[key]
                     
-                # Remove from cache
-                del self.asset_cache[asset_id]
-                removed_count += 1
+                # Remove file
+                self._unindex_file(asset_data['local_path'])
+                try:
+                    Path(asset_data['local_path']).unlink(missing_ok=True)
+                except OSError as e:
+                    self.logger.warning(f"Failed to remove orphaned asset {asset_id}: {e}")
+                self._dirty_assets.discard(asset_id)
                 
-        if removed_count > 0:
-            self._save_cache()
-            self.logger.info(f"Cleaned up {removed_count} orphaned assets")
-            
-        return removed_count
-        
-    def _respect_rate_limit(self):
-        """Ensure rate limiting between downloads"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_download_time
+            if orphaned:
+                self._delete_assets(orphaned)
+                self.logger.info(f"Cleaned up {len(orphaned)} orphaned assets")
+                
+        return len(orphaned)
         
-        if time_since_last < self.download_delay:
-            sleep_time = self.download_delay - time_since_last
-            time.sleep(sleep_time)
+    def _respect_rate_limit(self, url: str):
+        """Space out request starts to one host without blocking other hosts"""
+        delay = self._reserve_request_start(url)
+        if delay > 0:
+            time.sleep(delay)
             
-        self.last_download_time = time.time()
+    def _reserve_request_start(self, url: str) -> float:
+        """Claim the next request start for the URL's host; returns seconds to wait"""
+        host = urlsplit(url).netloc
+        with self._rate_lock:
+            now = time.monotonic()
+            start_time = max(now, self._next_request_time.get(host, now))
+            self._next_request_time[host] = start_time + self.download_delay
+        return start_time - now
+        
+    def _init_database(self):
+        """Create the asset and relationship tables and the asset book lookup index"""
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS assets (
+                url_hash TEXT PRIMARY KEY,
+                book_id TEXT,
+                asset_type TEXT,
+                data TEXT NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS ix_assets_book ON assets(book_id, asset_type)")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS relationships (
+                book_id TEXT,
+                related_book_id TEXT,
+                relationship_type TEXT,
+                confidence REAL,
+                metadata TEXT
+            )
+        """)
         
     def _load_cache(self) -> Dict:
-        """Load asset cache from file"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                self.logger.error(f"Failed to load asset cache: {e}")
+        """Load asset cache from the database, importing a legacy JSON cache once"""
+        try:
+            rows = self.db.execute("SELECT url_hash, data FROM assets").fetchall()
+            if rows:
+                return {url_hash: _json_loads(data) for url_hash, data in rows}
+            if self.cache_file.exists():
+                cache = _json_loads(self.cache_file.read_bytes())
+                self._write_assets(cache)
+                self.cache_file.rename(self.cache_file.with_suffix('.json.migrated'))
+                self.logger.info(f"Imported {len(cache)} assets from {self.cache_file.name}")
+                return cache
+        except Exception as e:
+            self.logger.error(f"Failed to load asset cache: {e}")
         return {}
         
+    def _migrate_cache_keys(self):
+        """Re-key entries cached under the old MD5 URL hashes"""
+        migrated = {}
+        for key, asset_data in self.asset_cache.items():
+            new_key = self._generate_asset_id(asset_data['url']) if asset_data.get('url') else key
+            if new_key != key:
+                asset_data['id'] = new_key
+            migrated[new_key] = asset_data
+            
+        if any(key not in migrated for key in self.asset_cache):
+            self.logger.info("Migrated asset cache keys to BLAKE2b")
+            self.asset_cache = migrated
+            self._save_cache()
+            
     def _save_cache(self):
-        """Save asset cache to file"""
+        """Rewrite the asset table from the in-memory cache"""
         try:
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.asset_cache, f, indent=2)
+            with self._cache_lock:
+                self._write_assets(self.asset_cache, replace_all=True)
+                self._dirty_assets.clear()
         except Exception as e:
             self.logger.error(f"Failed to save asset cache: {e}")
             
-    def _load_relationships(self) -> List[BookRelationship]:
-        """Load relationships from file"""
-        if self.relationships_file.exists():
-            try:
-                with open(self.relationships_file, 'r') as f:
-                    data = json.load(f)
-                    return [BookRelationship(**rel) for rel in data]
-            except Exception as e:
-                self.logger.error(f"Failed to load relationships: {e}")
-        return []
-        
-    def _save_relationships(self):
-        """Save relationships to file"""
+    def _save_asset(self, url_hash: str):
+        """Queue a cached asset for the next batched upsert"""
+        with self._cache_lock:
+            self._index_asset(url_hash, self.asset_cache[url_hash])
+            self._dirty_assets.add(url_hash)
+            if len(self._dirty_assets) >= self._flush_interval:
+                self.flush()
+            
+    def _index_asset(self, url_hash: str, asset_data: Dict):
+        """Point the asset's (book_id, asset_type) lookup at url_hash"""
+        if asset_data.get('book_id'):
+            self._by_book_type[(asset_data['book_id'], asset_data.get('asset_type'))] = url_hash
+            
+    def _delete_assets(self, url_hashes: List[str]):
+        """Delete asset rows in one transaction"""
         try:
-            data = [rel.__dict__ for rel in self.relationships]
-            with open(self.relationships_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            with self.db:
+                self.db.execute("BEGIN")
+                self.db.executemany("DELETE FROM assets WHERE url_hash = ?", ((url_hash,) for url_hash in url_hashes))
         except Exception as e:
-            self.logger.error(f"Failed to save relationships: {e}")
+            self.logger.error(f"Failed to save asset cache: {e}")
             
+    def _write_assets(self, cache: Dict, replace_all: bool = False):
+        """Write cache entries in one transaction"""
+        _write_asset_rows(self.db, cache, replace_all)
+        
+    def _load_relationships(self) -> List[BookRelationship]:
+        """Load relationships from the database, importing a legacy JSON file once"""
+        try:
+            rows = self.db.execute("SELECT * FROM relationships ORDER BY rowid").fetchall()
+            if rows:
+                return [
+                    BookRelationship(book_id, related_book_id, relationship_type, confidence, _json_loads(metadata))
+                    for book_id, related_book_id, relationship_type, confidence, metadata in rows
+                ]
+            if self.relationships_file.exists():
+                relationships = [BookRelationship(**rel) for rel in _json_loads(self.relationships_file.read_bytes())]
+                self._save_relationships(relationships)
+                self.relationships_file.rename(self.relationships_file.with_suffix('.json.migrated'))
+                return relationships
+        except Exception as e:
+            self.logger.error(f"Failed to load relationships: {e}")
+        return []
+        
+    def _save_relationships(self, relationships: List[BookRelationship]):
+        """Append relationships to the database in one transaction"""
+        _insert_relationships(self.db, relationships)
+        
+    def _scan_files(self, directory: Path):
+        """Yield DirEntry objects for every file below directory"""
+        # scandir hands back type and stat info from the directory read itself,
+        # avoiding a Path object and an extra stat() call per file
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._scan_files(entry.path)
+                elif entry.is_file():
+                    yield entry
+                    
     def get_storage_stats(self) -> Dict:
         """Get storage statistics"""
         total_size = 0
         file_count = 0
         
-        for root, dirs, files in os.walk(self.assets_dir):
-            for file in files:
-                file_path = Path(root) / file
-                if file_path.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']:
-                    total_size += file_path.stat().st_size
-                    file_count += 1
-                    
+        for entry in self._scan_files(self.assets_dir):
+            if os.path.splitext(entry.name)[1].lower() in _IMAGE_SUFFIXES:
+                total_size += entry.stat().st_size
+                file_count += 1
+                
         return {
             'total_size_mb': total_size / (1024 * 1024),
             'file_count': file_count,
@@ -13,14 +13,20 @@ Run with: python system_monitor.py
 
 import os
 import sys
+import math
 import time
 import json
+import array
+import queue
 import psutil
 import logging
 import threading
+from collections import deque
+from concurrent.futures import Future, wait
+from itertools import count, takewhile
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Callable
-from dataclasses import dataclass, asdict
+from typing import Deque, Dict, Any, List, Optional, Callable, Tuple
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import statistics
 from enum import Enum
@@ -28,6 +34,18 @@ import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -35,6 +53,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _dump_json(data: Any) -> bytes:
+    """Serialize to indented JSON, with orjson when available."""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, default=_json_default).encode('utf-8')
+
+def _json_default(value: Any) -> Any:
+    """Fallback encoder for values the stdlib json module cannot serialize."""
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+# Slotted records drop the per-instance __dict__ on Python 3.10+.
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
 class AlertSeverity(Enum):
     """Alert severity levels."""
     LOW = "low"
@@ -42,7 +75,7 @@ class AlertSeverity(Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
-@dataclass
+@dataclass(**_SLOTS)
 class SystemMetrics:
     """System performance metrics."""
     timestamp: float
@@ -55,8 +88,23 @@ class SystemMetrics:
     network_bytes_recv: int
     process_count: int
     load_average: List[float]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dictionary."""
+        return {
+            'timestamp': self.timestamp,
+            'cpu_percent': self.cpu_percent,
+            'memory_percent': self.memory_percent,
+            'memory_available_gb': self.memory_available_gb,
+            'disk_usage_percent': self.disk_usage_percent,
+            'disk_free_gb': self.disk_free_gb,
+            'network_bytes_sent': self.network_bytes_sent,
+            'network_bytes_recv': self.network_bytes_recv,
+            'process_count': self.process_count,
+            'load_average': list(self.load_average)
+        }
 
-@dataclass
+@dataclass(**_SLOTS)
 class ApplicationMetrics:
     """Application-specific metrics."""
     timestamp: float
@@ -69,8 +117,23 @@ class ApplicationMetrics:
     failed_files: int
     cache_hit_rate: float
     memory_usage_mb: float
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dictionary."""
+        return {
+            'timestamp': self.timestamp,
+            'active_connections': self.active_connections,
+            'request_count': self.request_count,
+            'error_count': self.error_count,
+            'avg_response_time': self.avg_response_time,
+            'queue_size': self.queue_size,
+            'processed_files': self.processed_files,
+            'failed_files': self.failed_files,
+            'cache_hit_rate': self.cache_hit_rate,
+            'memory_usage_mb': self.memory_usage_mb
+        }
 
-@dataclass
+@dataclass(**_SLOTS)
 class Alert:
     """Alert data structure."""
     id: str
@@ -83,6 +146,21 @@ class Alert:
     threshold: float
     acknowledged: bool = False
     resolved: bool = False
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to a plain dictionary, with the severity as its string value."""
+        return {
+            'id': self.id,
+            'severity': self.severity.value,
+            'title': self.title,
+            'message': self.message,
+            'timestamp': self.timestamp,
+            'metric_name': self.metric_name,
+            'metric_value': self.metric_value,
+            'threshold': self.threshold,
+            'acknowledged': self.acknowledged,
+            'resolved': self.resolved
+        }
 
 class AlertManager:
     """Manages system alerts and notifications."""
@@ -90,9 +168,19 @@ class AlertManager:
     def __init__(self, config: Dict[str, Any] = None):
         """Initialize alert manager."""
         self.config = config or {}
-        self.alerts: List[Alert] = []
+        self.alerts: Dict[str, Alert] = {}  # Active alerts by id
         self.alert_handlers: List[Callable] = []
-        self.alert_history: List[Alert] = []
+        self.alert_history: Deque[Alert] = deque(maxlen=self.config.get('history_size', 10000))
+        self._alert_seq = count(1)  # Unique alert id suffixes
+        self._clock = time.monotonic  # Interval arithmetic; wall time is kept only on Alert.timestamp
+        
+        # Repeats of a (metric, severity) alert within this many seconds are dropped
+        self._suppress_window = self.config.get('suppress_window', 300.0)
+        self._last_triggered: Dict[Tuple[str, AlertSeverity], float] = {}
+        
+        # Running counts over the active alerts, kept in step by trigger/acknowledge/resolve
+        self._severity_counts: Dict[AlertSeverity, int] = {severity: 0 for severity in AlertSeverity}
+        self._unack_count = 0
         
         # Default thresholds
         self.thresholds = {
@@ -107,6 +195,14 @@ class AlertManager:
         # Update thresholds from config
         if 'thresholds' in self.config:
             self.thresholds.update(self.config['thresholds'])
+        
+        # (floor, critical, warning) per metric, floor being the lower of the two limits;
+        # resolved once so checks are a single lookup
+        self._threshold_limits = {
+            name: (min(critical, warning), critical, warning)
+            for name, limits in self.thresholds.items()
+            for critical, warning in [(limits.get('critical', math.inf), limits.get('warning', math.inf))]
+        }
     
     def add_alert_handler(self, handler: Callable):
         """Add an alert handler function."""
@@ -114,40 +210,48 @@ class AlertManager:
     
     def check_metric_thresholds(self, metric_name: str, value: float) -> Optional[Alert]:
         """Check if a metric exceeds thresholds."""
-        if metric_name not in self.thresholds:
+        limits = self._threshold_limits.get(metric_name)
+        if limits is None:
+            return None
+        
+        # Common case: a single comparison against the lower of the two limits;
+        # written as "not >=" so a NaN reading never alerts
+        floor, critical, warning = limits
+        if not value >= floor:
             return None
         
-        thresholds = self.thresholds[metric_name]
-        alert_id = f"{metric_name}_{int(time.time())}"
-        
-        if value >= thresholds.get('critical', float('inf')):
-            return Alert(
-                id=alert_id,
-                severity=AlertSeverity.CRITICAL,
-                title=f"Critical {metric_name} threshold exceeded",
-                message=f"{metric_name} is at {value:.2f}, exceeding critical threshold of {thresholds['critical']:.2f}",
-                timestamp=time.time(),
-                metric_name=metric_name,
-                metric_value=value,
-                threshold=thresholds['critical']
-            )
-        elif value >= thresholds.get('warning', float('inf')):
-            return Alert(
-                id=alert_id,
-                severity=AlertSeverity.HIGH,
-                title=f"Warning {metric_name} threshold exceeded",
-                message=f"{metric_name} is at {value:.2f}, exceeding warning threshold of {thresholds['warning']:.2f}",
-                timestamp=time.time(),
-                metric_name=metric_name,
-                metric_value=value,
-                threshold=thresholds['warning']
-            )
-        
-        return None
+        if value >= critical:
+            return self._build_alert(metric_name, value, AlertSeverity.CRITICAL, "Critical", "critical", critical)
+        return self._build_alert(metric_name, value, AlertSeverity.HIGH, "Warning", "warning", warning)
+    
+    def _build_alert(self, metric_name: str, value: float, severity: AlertSeverity,
+                     label: str, level: str, threshold: float) -> Alert:
+        """Create the alert for a metric that crossed one of its thresholds."""
+        return Alert(
+            id=f"{metric_name}_{next(self._alert_seq)}",
+            severity=severity,
+            title=f"{label} {metric_name} threshold exceeded",
+            message=f"{metric_name} is at {value:.2f}, exceeding {level} threshold of {threshold:.2f}",
+            timestamp=time.time(),
+            metric_name=metric_name,
+            metric_value=value,
+            threshold=threshold
+        )
     
     def trigger_alert(self, alert: Alert):
         """Trigger an alert and notify handlers."""
-        self.alerts.append(alert)
+        key = (alert.metric_name, alert.severity)
+        now = self._clock()
+        last_triggered = self._last_triggered.get(key)
+        if last_triggered is not None and now - last_triggered < self._suppress_window:
+            logger.debug(f"Suppressed repeat alert: {alert.title}")
+            return
+        self._last_triggered[key] = now
+        
+        self._forget(self.alerts.get(alert.id))
+        self.alerts[alert.id] = alert
+        self._severity_counts[alert.severity] += 1
+        self._unack_count += not alert.acknowledged
         self.alert_history.append(alert)
         
         logger.warning(f"ALERT [{alert.severity.value.upper()}]: {alert.title}")
@@ -162,38 +266,41 @@ class AlertManager:
     
     def acknowledge_alert(self, alert_id: str):
         """Acknowledge an alert."""
-        for alert in self.alerts:
-            if alert.id == alert_id:
-                alert.acknowledged = True
-                logger.info(f"Alert {alert_id} acknowledged")
-                break
+        alert = self.alerts.get(alert_id)
+        if alert:
+            self._unack_count -= not alert.acknowledged
+            alert.acknowledged = True
+            logger.info(f"Alert {alert_id} acknowledged")
     
     def resolve_alert(self, alert_id: str):
         """Resolve an alert."""
-        for alert in self.alerts:
-            if alert.id == alert_id:
-                alert.resolved = True
-                logger.info(f"Alert {alert_id} resolved")
-                break
-        
         # Remove from active alerts
-        self.alerts = [a for a in self.alerts if a.id != alert_id]
+        alert = self.alerts.pop(alert_id, None)
+        if alert:
+            self._forget(alert)
+            alert.resolved = True
+            logger.info(f"Alert {alert_id} resolved")
+    
+    def _forget(self, alert: Optional[Alert]):
+        """Remove an alert that is leaving the active set from the running counts."""
+        if alert:
+            self._severity_counts[alert.severity] -= 1
+            self._unack_count -= not alert.acknowledged
     
     def get_active_alerts(self) -> List[Alert]:
         """Get all active alerts."""
-        return [a for a in self.alerts if not a.resolved]
+        return list(self.alerts.values())
     
     def get_alert_summary(self) -> Dict[str, Any]:
         """Get alert summary statistics."""
-        active_alerts = self.get_active_alerts()
-        
+        severity_counts = self._severity_counts
         return {
-            'total_active': len(active_alerts),
-            'critical': len([a for a in active_alerts if a.severity == AlertSeverity.CRITICAL]),
-            'high': len([a for a in active_alerts if a.severity == AlertSeverity.HIGH]),
-            'medium': len([a for a in active_alerts if a.severity == AlertSeverity.MEDIUM]),
-            'low': len([a for a in active_alerts if a.severity == AlertSeverity.LOW]),
-            'unacknowledged': len([a for a in active_alerts if not a.acknowledged])
+            'total_active': len(self.alerts),
+            'critical': severity_counts[AlertSeverity.CRITICAL],
+            'high': severity_counts[AlertSeverity.HIGH],
+            'medium': severity_counts[AlertSeverity.MEDIUM],
+            'low': severity_counts[AlertSeverity.LOW],
+            'unacknowledged': self._unack_count
         }
 
 class SystemMonitor:
@@ -203,13 +310,36 @@ class SystemMonitor:
         """Initialize system monitor."""
         self.alert_manager = alert_manager
         self.monitoring = False
-        self.metrics_history: List[SystemMetrics] = []
+        self._stop_event = threading.Event()  # Wakes the monitor loop early on shutdown
+        self._clock = time.monotonic  # Interval arithmetic; wall time is kept only on SystemMetrics.timestamp
         self.max_history_size = 1000
+        self.metrics_history: Deque[SystemMetrics] = deque(maxlen=self.max_history_size)
+        
+        # Columnar ring buffers mirroring metrics_history, so summaries reduce contiguous arrays;
+        # sample times are on the monotonic clock so wall clock steps cannot skew the window
+        if HAS_NUMPY:
+            self._sample_times = np.empty(self.max_history_size)
+            self._cpu_samples = np.empty(self.max_history_size)
+            self._memory_samples = np.empty(self.max_history_size)
+            self._disk_samples = np.empty(self.max_history_size)
+        self._sample_index = 0
+        self._sample_count = 0
+        
+        # Snapshots younger than this are reused instead of re-reading psutil
+        self._cache_ttl = 5.0
+        self._last_metrics: Optional[SystemMetrics] = None
+        self._last_metrics_time = 0.0
+        
+        # Prime the CPU counter; later non-blocking calls report usage since the previous call
+        psutil.cpu_percent(interval=None)
     
-    def collect_system_metrics(self) -> SystemMetrics:
-        """Collect current system metrics."""
+    def collect_system_metrics(self, use_cache: bool = True) -> SystemMetrics:
+        """Collect current system metrics, reusing a snapshot younger than the cache TTL unless use_cache is False."""
+        if use_cache and self._last_metrics is not None and self._clock() - self._last_metrics_time < self._cache_ttl:
+            return self._last_metrics
+        
         # CPU metrics
-        cpu_percent = psutil.cpu_percent(interval=1)
+        cpu_percent = psutil.cpu_percent(interval=None)
         
         # Memory metrics
         memory = psutil.virtual_memory()
@@ -248,8 +378,28 @@ class SystemMonitor:
             load_average=load_average
         )
         
+        self._last_metrics = metrics
+        self._last_metrics_time = self._clock()
         return metrics
     
+    def get_latest_metrics(self) -> SystemMetrics:
+        """Latest sample from the monitor loop, collecting one only if it is not running."""
+        if self.monitoring and self.metrics_history:
+            return self.metrics_history[-1]
+        return self.collect_system_metrics()
+    
+    def _record_metrics(self, metrics: SystemMetrics):
+        """Append a sample to the history and its columnar buffers."""
+        self.metrics_history.append(metrics)
+        if HAS_NUMPY:
+            i = self._sample_index
+            self._sample_times[i] = self._clock()
+            self._cpu_samples[i] = metrics.cpu_percent
+            self._memory_samples[i] = metrics.memory_percent
+            self._disk_samples[i] = metrics.disk_usage_percent
+            self._sample_index = (i + 1) % self.max_history_size
+            self._sample_count = min(self._sample_count + 1, self.max_history_size)
+    
     def check_system_alerts(self, metrics: SystemMetrics):
         """Check system metrics against alert thresholds."""
         checks = [
@@ -266,6 +416,7 @@ class SystemMonitor:
     def start_monitoring(self, interval: float = 60.0):
         """Start system monitoring."""
         self.monitoring = True
+        self._stop_event.clear()
         self.monitor_thread = threading.Thread(
             target=self._monitor_loop,
             args=(interval,)
@@ -278,6 +429,7 @@ class SystemMonitor:
     def stop_monitoring(self):
         """Stop system monitoring."""
         self.monitoring = False
+        self._stop_event.set()
         if hasattr(self, 'monitor_thread'):
             self.monitor_thread.join(timeout=5.0)
         
@@ -285,17 +437,14 @@ class SystemMonitor:
     
     def _monitor_loop(self, interval: float):
         """Main monitoring loop."""
+        next_deadline = self._clock() + interval
         while self.monitoring:
             try:
-                # Collect metrics
-                metrics = self.collect_system_metrics()
-                
-                # Store metrics
-                self.metrics_history.append(metrics)
+                # Collect a fresh sample; a cached one would be recorded and alerted on twice
+                metrics = self.collect_system_metrics(use_cache=False)
                 
-                # Trim history if needed
-                if len(self.metrics_history) > self.max_history_size:
-                    self.metrics_history = self.metrics_history[-self.max_history_size:]
+                # Store metrics (the ring buffers drop the oldest sample when full)
+                self._record_metrics(metrics)
                 
                 # Check alerts
                 self.check_system_alerts(metrics)
@@ -305,42 +454,58 @@ class SystemMonitor:
                            f"Memory: {metrics.memory_percent:.1f}%, "
                            f"Disk: {metrics.disk_usage_percent:.1f}%")
                 
-                time.sleep(interval)
-                
             except Exception as e:
                 logger.error(f"System monitoring error: {e}")
-                time.sleep(interval)
+            
+            # Sleep until the next deadline so time spent collecting does not stretch the interval
+            sleep_for = next_deadline - self._clock()
+            if sleep_for > 0:
+                self._stop_event.wait(sleep_for)
+                next_deadline += interval
+            else:
+                logger.warning(f"System monitoring fell {-sleep_for:.1f}s behind schedule; resynchronizing")
+                next_deadline = self._clock() + interval
     
     def get_metrics_summary(self, duration_minutes: int = 60) -> Dict[str, Any]:
         """Get system metrics summary for the specified duration."""
+        if HAS_NUMPY:
+            return self._summarize_columns(duration_minutes, self._clock() - duration_minutes * 60)
+        
         cutoff_time = time.time() - (duration_minutes * 60)
-        recent_metrics = [m for m in self.metrics_history if m.timestamp >= cutoff_time]
+        # History is in time order, so walk back from the newest sample and stop at the cutoff
+        recent_metrics = list(takewhile(lambda m: m.timestamp >= cutoff_time, reversed(self.metrics_history)))
+        recent_metrics.reverse()
         
         if not recent_metrics:
             return {}
         
-        cpu_values = [m.cpu_percent for m in recent_metrics]
-        memory_values = [m.memory_percent for m in recent_metrics]
-        disk_values = [m.disk_usage_percent for m in recent_metrics]
+        # Fill all three columns in a single pass over the samples
+        cpu_values = array.array('d')
+        memory_values = array.array('d')
+        disk_values = array.array('d')
+        for m in recent_metrics:
+            cpu_values.append(m.cpu_percent)
+            memory_values.append(m.memory_percent)
+            disk_values.append(m.disk_usage_percent)
         
         return {
             'duration_minutes': duration_minutes,
             'sample_count': len(recent_metrics),
             'cpu': {
-                'avg': statistics.mean(cpu_values),
+                'avg': statistics.fmean(cpu_values),
                 'min': min(cpu_values),
                 'max': max(cpu_values),
                 'current': recent_metrics[-1].cpu_percent
             },
             'memory': {
-                'avg': statistics.mean(memory_values),
+                'avg': statistics.fmean(memory_values),
                 'min': min(memory_values),
                 'max': max(memory_values),
                 'current': recent_metrics[-1].memory_percent,
                 'available_gb': recent_metrics[-1].memory_available_gb
             },
             'disk': {
-                'avg': statistics.mean(disk_values),
+                'avg': statistics.fmean(disk_values),
                 'min': min(disk_values),
                 'max': max(disk_values),
                 'current': recent_metrics[-1].disk_usage_percent,
@@ -348,19 +513,60 @@ class SystemMonitor:
             }
         }
 
+    def _summarize_columns(self, duration_minutes: int, cutoff_time: float) -> Dict[str, Any]:
+        """Vectorized get_metrics_summary over the columnar ring buffers."""
+        n = self._sample_count
+        mask = self._sample_times[:n] >= cutoff_time
+        sample_count = int(np.count_nonzero(mask))
+        if not sample_count:
+            return {}
+        
+        cpu_values = self._cpu_samples[:n][mask]
+        memory_values = self._memory_samples[:n][mask]
+        disk_values = self._disk_samples[:n][mask]
+        latest = self.metrics_history[-1]
+        
+        return {
+            'duration_minutes': duration_minutes,
+            'sample_count': sample_count,
+            'cpu': {
+                'avg': float(cpu_values.mean()),
+                'min': float(cpu_values.min()),
+                'max': float(cpu_values.max()),
+                'current': latest.cpu_percent
+            },
+            'memory': {
+                'avg': float(memory_values.mean()),
+                'min': float(memory_values.min()),
+                'max': float(memory_values.max()),
+                'current': latest.memory_percent,
+                'available_gb': latest.memory_available_gb
+            },
+            'disk': {
+                'avg': float(disk_values.mean()),
+                'min': float(disk_values.min()),
+                'max': float(disk_values.max()),
+                'current': latest.disk_usage_percent,
+                'free_gb': latest.disk_free_gb
+            }
+        }
+
 class ApplicationMonitor:
     """Monitors application-specific metrics."""
     
     def __init__(self, alert_manager: AlertManager):
         """Initialize application monitor."""
         self.alert_manager = alert_manager
-        self.metrics_history: List[ApplicationMetrics] = []
         self.max_history_size = 1000
+        self.metrics_history: Deque[ApplicationMetrics] = deque(maxlen=self.max_history_size)
         
-        # Application state
+        # Application state; recorders may be called from many worker threads, so every
+        # update and the snapshot in collect_application_metrics hold _lock
+        self._lock = threading.Lock()
         self.request_count = 0
         self.error_count = 0
-        self.response_times = []
+        self.response_times: Deque[float] = deque(maxlen=100)
+        self._response_time_sum = 0.0  # Running total of response_times
         self.processed_files = 0
         self.failed_files = 0
         self.cache_hits = 0
@@ -368,38 +574,43 @@ class ApplicationMonitor:
     
     def record_request(self, response_time: float, success: bool = True):
         """Record a request with response time."""
-        self.request_count += 1
-        self.response_times.append(response_time)
-        
-        # Keep only recent response times
-        if len(self.response_times) > 100:
-            self.response_times = self.response_times[-100:]
-        
-        if not success:
-            self.error_count += 1
+        with self._lock:
+            self.request_count += 1
+            if len(self.response_times) == self.response_times.maxlen:
+                self._response_time_sum -= self.response_times[0]  # About to be evicted
+            self.response_times.append(response_time)  # Keeps only the 100 most recent
+            self._response_time_sum += response_time
+            
+            if not success:
+                self.error_count += 1
     
     def record_file_processing(self, success: bool = True):
         """Record file processing result."""
-        if success:
-            self.processed_files += 1
-        else:
-            self.failed_files += 1
+        with self._lock:
+            if success:
+                self.processed_files += 1
+            else:
+                self.failed_files += 1
     
     def record_cache_hit(self):
         """Record cache hit."""
-        self.cache_hits += 1
+        with self._lock:
+            self.cache_hits += 1
     
     def record_cache_miss(self):
         """Record cache miss."""
-        self.cache_misses += 1
+        with self._lock:
+            self.cache_misses += 1
     
     def collect_application_metrics(self) -> ApplicationMetrics:
         """Collect current application metrics."""
-        # Calculate metrics
-        avg_response_time = statistics.mean(self.response_times) if self.response_times else 0.0
-        
-        total_cache_requests = self.cache_hits + self.cache_misses
-        cache_hit_rate = (self.cache_hits / total_cache_requests * 100) if total_cache_requests > 0 else 0.0
+        # Calculate metrics over a consistent snapshot, since recorders may run concurrently
+        with self._lock:
+            avg_response_time = self._response_time_sum / len(self.response_times) if self.response_times else 0.0
+            total_cache_requests = self.cache_hits + self.cache_misses
+            cache_hit_rate = (self.cache_hits / total_cache_requests * 100) if total_cache_requests > 0 else 0.0
+            request_count, error_count = self.request_count, self.error_count
+            processed_files, failed_files = self.processed_files, self.failed_files
         
         # Get process memory usage
         try:
@@ -411,12 +622,12 @@ class ApplicationMonitor:
         metrics = ApplicationMetrics(
             timestamp=time.time(),
             active_connections=0,  # Would be set by application
-            request_count=self.request_count,
-            error_count=self.error_count,
+            request_count=request_count,
+            error_count=error_count,
             avg_response_time=avg_response_time,
             queue_size=0,  # Would be set by application
-            processed_files=self.processed_files,
-            failed_files=self.failed_files,
+            processed_files=processed_files,
+            failed_files=failed_files,
             cache_hit_rate=cache_hit_rate,
             memory_usage_mb=memory_usage_mb
         )
@@ -448,14 +659,81 @@ class HealthChecker:
         self.system_monitor = system_monitor
         self.app_monitor = app_monitor
         self.health_checks = {}
-        self.last_check_time = time.time()
+        self._clock = time.monotonic
+        self.last_check_time = self._clock()
+        
+        # Custom check results are reused for _check_ttl seconds; a check still running
+        # after _check_timeout seconds is reported as timed out
+        self._check_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._check_ttl = 10.0
+        self._check_timeout = 2.0
+        
+        # Checks run on daemon threads, so one that hangs cannot block interpreter exit;
+        # a check that overran keeps its future here and is not started again until it finishes
+        self._pending: Dict[str, Future] = {}
     
     def add_health_check(self, name: str, check_func: Callable):
         """Add a custom health check."""
         self.health_checks[name] = check_func
+        self._check_cache.pop(name, None)
     
-    def run_health_checks(self) -> Dict[str, Any]:
-        """Run all health checks."""
+    def _run_custom_checks(self) -> Dict[str, Dict[str, Any]]:
+        """Run stale custom checks concurrently and return every check's latest result."""
+        now = self._clock()
+        results = {}
+        stale = {}
+        for name, check_func in self.health_checks.items():
+            cached = self._check_cache.get(name)
+            if cached is not None and now - cached[0] < self._check_ttl:
+                results[name] = cached[1]
+            else:
+                stale[name] = check_func
+        
+        if stale:
+            futures = {}
+            for name, check_func in stale.items():
+                future = self._pending.get(name)
+                if future is None:
+                    future = self._pending[name] = self._start_check(name, check_func)
+                futures[name] = future
+            wait(futures.values(), timeout=self._check_timeout)
+            
+            now = self._clock()
+            for name, future in futures.items():
+                if not future.done():
+                    result = {'status': 'timeout', 'error': f"Check did not finish within {self._check_timeout:.1f}s"}
+                else:
+                    del self._pending[name]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {'status': 'error', 'error': str(e)}
+                self._check_cache[name] = (now, result)
+                results[name] = result
+        
+        return results
+    
+    @staticmethod
+    def _start_check(name: str, check_func: Callable) -> Future:
+        """Run a custom check on its own daemon thread, returning a future for its result."""
+        future: Future = Future()
+        
+        def run():
+            try:
+                future.set_result(check_func())
+            except Exception as e:
+                future.set_exception(e)
+        
+        future.set_running_or_notify_cancel()
+        threading.Thread(target=run, name=f"health-check-{name}", daemon=True).start()
+        return future
+    
+    def close(self):
+        """Stop tracking running checks; a hung check's daemon thread is abandoned, not joined."""
+        self._pending.clear()
+    
+    def run_health_checks(self, app_metrics: Optional[ApplicationMetrics] = None) -> Dict[str, Any]:
+        """Run all health checks, reusing app_metrics if the caller already collected them."""
         results = {
             'timestamp': time.time(),
             'overall_status': 'healthy',
@@ -463,7 +741,7 @@ class HealthChecker:
         }
         
         # System health checks
-        system_metrics = self.system_monitor.collect_system_metrics()
+        system_metrics = self.system_monitor.get_latest_metrics()
         results['checks']['system'] = {
             'status': 'healthy',
             'cpu_percent': system_metrics.cpu_percent,
@@ -479,7 +757,8 @@ class HealthChecker:
             results['overall_status'] = 'warning'
         
         # Application health checks
-        app_metrics = self.app_monitor.collect_application_metrics()
+        if app_metrics is None:
+            app_metrics = self.app_monitor.collect_application_metrics()
         results['checks']['application'] = {
             'status': 'healthy',
             'error_rate': (app_metrics.error_count / max(app_metrics.request_count, 1)) * 100,
@@ -495,24 +774,16 @@ class HealthChecker:
             results['overall_status'] = 'unhealthy'
         
         # Custom health checks
-        for name, check_func in self.health_checks.items():
-            try:
-                check_result = check_func()
-                results['checks'][name] = check_result
-                
-                if check_result.get('status') == 'unhealthy':
-                    results['overall_status'] = 'unhealthy'
-                elif check_result.get('status') == 'warning' and results['overall_status'] == 'healthy':
-                    results['overall_status'] = 'warning'
-                    
-            except Exception as e:
-                results['checks'][name] = {
-                    'status': 'error',
-                    'error': str(e)
-                }
+        for name, check_result in self._run_custom_checks().items():
+            results['checks'][name] = check_result
+            
+            status = check_result.get('status')
+            if status in ('unhealthy', 'error'):
                 results['overall_status'] = 'unhealthy'
+            elif status in ('warning', 'timeout') and results['overall_status'] == 'healthy':
+                results['overall_status'] = 'warning'
         
-        self.last_check_time = time.time()
+        self.last_check_time = self._clock()
         return results
     
     def get_health_status(self) -> Dict[str, Any]:
@@ -526,6 +797,47 @@ class EmailAlertHandler:
         """Initialize email alert handler."""
         self.smtp_config = smtp_config
         self.enabled = smtp_config.get('enabled', False)
+        
+        # One authenticated session is reused across alerts
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_lock = threading.Lock()
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open and authenticate a new SMTP session."""
+        server = smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port'])
+        if self.smtp_config.get('use_tls'):
+            server.starttls()
+        if self.smtp_config.get('username'):
+            server.login(self.smtp_config['username'], self.smtp_config['password'])
+        return server
+    
+    def _get_conn(self) -> smtplib.SMTP:
+        """Return the cached SMTP session if it is still alive, reconnecting otherwise."""
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] == 250:
+                    return self._smtp
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._drop_conn()
+        
+        self._smtp = self._connect()
+        return self._smtp
+    
+    def _drop_conn(self):
+        """Discard the cached SMTP session."""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        self._smtp = None
+    
+    def close(self):
+        """Close the cached SMTP session."""
+        with self._smtp_lock:
+            self._drop_conn()
     
     def send_alert(self, alert: Alert):
         """Send alert via email."""
@@ -552,15 +864,13 @@ This is an automated alert from the Lexicon monitoring system.
             
             msg.attach(MIMEText(body, 'plain'))
             
-            # Send email
-            server = smtplib.SMTP(self.smtp_config['smtp_server'], self.smtp_config['smtp_port'])
-            if self.smtp_config.get('use_tls'):
-                server.starttls()
-            if self.smtp_config.get('username'):
-                server.login(self.smtp_config['username'], self.smtp_config['password'])
-            
-            server.send_message(msg)
-            server.quit()
+            # Send email, retrying once if the server dropped the session since the liveness check
+            with self._smtp_lock:
+                try:
+                    self._get_conn().send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    self._drop_conn()
+                    self._get_conn().send_message(msg)
             
             logger.info(f"Email alert sent for {alert.id}")
             
@@ -586,6 +896,13 @@ class MonitoringSystem:
         # Monitoring state
         self.running = False
         
+        # Snapshots are serialized and written by a background thread, which stop() drains and joins;
+        # _snapshot_lock keeps a snapshot from being queued behind the writer's shutdown sentinel
+        self._snapshot_queue: queue.Queue = queue.Queue(maxsize=4)
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_stop = threading.Event()
+        self._start_snapshot_writer()
+        
         logger.info("Monitoring system initialized")
     
     def load_config(self, config_path: Optional[str]) -> Dict[str, Any]:
@@ -621,9 +938,10 @@ class MonitoringSystem:
         """Setup alert handlers."""
         # Email handler
         email_config = self.config.get('email', {})
+        self.email_handler: Optional[EmailAlertHandler] = None
         if email_config.get('enabled'):
-            email_handler = EmailAlertHandler(email_config)
-            self.alert_manager.add_alert_handler(email_handler.send_alert)
+            self.email_handler = EmailAlertHandler(email_config)
+            self.alert_manager.add_alert_handler(self.email_handler.send_alert)
     
     def start(self):
         """Start the monitoring system."""
@@ -632,6 +950,8 @@ class MonitoringSystem:
             return
         
         self.running = True
+        if self._snapshot_stop.is_set():
+            self._start_snapshot_writer()
         
         # Start system monitoring
         system_interval = self.config.get('monitoring', {}).get('system_interval', 60.0)
@@ -641,6 +961,7 @@ class MonitoringSystem:
     
     def stop(self):
         """Stop the monitoring system."""
+        self._stop_snapshot_writer()
         if not self.running:
             return
         
@@ -648,30 +969,77 @@ class MonitoringSystem:
         
         # Stop monitors
         self.system_monitor.stop_monitoring()
+        self.health_checker.close()
+        if self.email_handler:
+            self.email_handler.close()
         
         logger.info("Monitoring system stopped")
     
     def get_dashboard_data(self) -> Dict[str, Any]:
         """Get data for monitoring dashboard."""
+        app_metrics = self.app_monitor.collect_application_metrics()
         return {
             'timestamp': time.time(),
             'system_metrics': self.system_monitor.get_metrics_summary(60),
-            'application_metrics': asdict(self.app_monitor.collect_application_metrics()),
+            'application_metrics': app_metrics.to_dict(),
             'alerts': {
-                'active': [asdict(alert) for alert in self.alert_manager.get_active_alerts()],
+                'active': [alert.to_dict() for alert in self.alert_manager.get_active_alerts()],
                 'summary': self.alert_manager.get_alert_summary()
             },
-            'health_status': self.health_checker.get_health_status()
+            'health_status': self.health_checker.run_health_checks(app_metrics)
         }
     
     def save_metrics_snapshot(self, filepath: str):
-        """Save current metrics snapshot to file."""
+        """Queue the current metrics snapshot to be written to file."""
+        # get_dashboard_data builds fresh dicts, so the writer never sees live state
         data = self.get_dashboard_data()
         
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        logger.info(f"Metrics snapshot saved to {filepath}")
+        with self._snapshot_lock:
+            if self._snapshot_stop.is_set():
+                logger.warning(f"Monitoring system is stopped; skipped snapshot for {filepath}")
+                return
+            try:
+                self._snapshot_queue.put_nowait((filepath, data))
+            except queue.Full:
+                logger.warning(f"Snapshot writer is behind; skipped snapshot for {filepath}")
+    
+    def flush_snapshots(self):
+        """Block until all queued snapshots have been written."""
+        self._snapshot_queue.join()
+    
+    def _start_snapshot_writer(self):
+        """Start the background thread that writes queued snapshots."""
+        self._snapshot_stop.clear()
+        self._snapshot_thread = threading.Thread(target=self._snapshot_writer, daemon=True)
+        self._snapshot_thread.start()
+    
+    def _stop_snapshot_writer(self):
+        """Write the snapshots still queued, then stop and join the writer thread."""
+        with self._snapshot_lock:
+            if self._snapshot_stop.is_set():
+                return
+            self._snapshot_stop.set()
+            self._snapshot_queue.put(None)  # Sentinel, queued behind any pending snapshots
+        self._snapshot_thread.join()
+    
+    def _snapshot_writer(self):
+        """Write queued snapshots, replacing each target file atomically, until the stop sentinel."""
+        while True:
+            item = self._snapshot_queue.get()
+            if item is None:
+                self._snapshot_queue.task_done()
+                return
+            filepath, data = item
+            try:
+                tmp_path = f"{filepath}.tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(_dump_json(data))
+                os.replace(tmp_path, filepath)
+                logger.info(f"Metrics snapshot saved to {filepath}")
+            except Exception as e:
+                logger.error(f"Failed to save metrics snapshot to {filepath}: {e}")
+            finally:
+                self._snapshot_queue.task_done()
 
 def main():
     """Main function to run the monitoring system."""
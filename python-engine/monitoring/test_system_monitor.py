@@ -0,0 +1,60 @@
+"""
+Tests for HealthChecker custom check handling.
+"""
+
+import subprocess
+import sys
+import textwrap
+import threading
+from pathlib import Path
+
+from system_monitor import AlertManager, ApplicationMonitor, HealthChecker, SystemMonitor
+
+
+class TestHealthCheckerCustomChecks:
+    """Test custom checks that overrun their timeout."""
+    
+    def test_hung_check_is_not_restarted(self):
+        """Test a check still running from an earlier run is reported as timed out, not started again."""
+        alert_manager = AlertManager()
+        checker = HealthChecker(SystemMonitor(alert_manager), ApplicationMonitor(alert_manager))
+        checker._check_timeout = 0.05
+        checker._check_ttl = 0.0
+        release = threading.Event()
+        calls = []
+        
+        def slow_check():
+            calls.append(1)
+            release.wait()
+            return {'status': 'healthy'}
+        
+        checker.add_health_check('slow', slow_check)
+        try:
+            assert checker.run_health_checks()['checks']['slow']['status'] == 'timeout'
+            assert checker.run_health_checks()['checks']['slow']['status'] == 'timeout'
+            assert len(calls) == 1
+        finally:
+            release.set()
+            checker.close()
+    
+    def test_hung_check_does_not_block_stop_or_exit(self):
+        """Test the interpreter exits after stop() while a custom check hangs forever."""
+        script = textwrap.dedent("""
+            import threading
+            from system_monitor import MonitoringSystem
+            
+            monitor = MonitoringSystem()
+            monitor.health_checker._check_timeout = 0.05
+            monitor.health_checker.add_health_check('hung', threading.Event().wait)
+            monitor.start()
+            print(monitor.health_checker.run_health_checks()['checks']['hung']['status'])
+            monitor.stop()
+        """)
+        
+        completed = subprocess.run(
+            [sys.executable, '-c', script], cwd=Path(__file__).parent,
+            capture_output=True, text=True, timeout=30
+        )
+        
+        assert completed.returncode == 0, completed.stderr
+        assert completed.stdout.strip() == 'timeout'
@@ -1,10 +1,42 @@
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from typing import Dict, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
+from collections import Counter
+from functools import lru_cache
+from itertools import accumulate, repeat
 import logging
 from .content_categorizer import ContentDomain
 
+_SENTENCE_SPLIT = re.compile(r'[.!?]+')
+_KEYWORD = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+# Common stop words excluded from keyword extraction
+_STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'})
+
+_DEFAULT_FLAGS = re.compile('').flags
+
+@lru_cache(maxsize=64)
+def _compile_boundaries(patterns: Tuple[str, ...]) -> Tuple[re.Pattern, ...]:
+    """Compile boundary patterns, merged into one alternation when that matches the same lines"""
+    compiled = tuple(re.compile(pattern) for pattern in patterns)
+    # Groups (which backreferences number from) and global inline flags such as (?i)
+    # would shift or break inside an alternation, so such patterns are matched one by one
+    if len(compiled) > 1 and all(pattern.groups == 0 and pattern.flags == _DEFAULT_FLAGS for pattern in compiled):
+        return (re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)),)
+    return compiled
+
+@lru_cache(maxsize=None)
+def _worker_chunker() -> 'AdvancedChunker':
+    """Chunker built once per metadata worker process"""
+    return AdvancedChunker()
+
+def _post_process_in_worker(chunk: 'TextChunk', index: int, config: 'ChunkConfig') -> 'TextChunk':
+    """Module-level entry point, so only the chunk and config are pickled to workers"""
+    return _worker_chunker()._post_process_chunk(chunk, index, config)
+
 class ChunkingStrategy(Enum):
     STANDARD = "standard"
     SECTION_BASED = "section_based"
@@ -24,6 +56,8 @@ class ChunkConfig:
     max_chunk_size: Optional[int] = None
     boundary_patterns: List[str] = None
     metadata_extraction: bool = True
+    parallel_metadata: bool = False
+    metadata_workers: Optional[int] = None
 
 @dataclass
 class TextChunk:
@@ -42,6 +76,10 @@ class AdvancedChunker:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
+        # Worker pool for parallel_metadata, started on first use and reused until close()
+        self._metadata_pool: Optional[ProcessPoolExecutor] = None
+        self._metadata_pool_workers = 0
+        
         # Domain-specific chunking configurations
         self.domain_configs = {
             ContentDomain.TECHNICAL: ChunkConfig(
@@ -119,7 +157,10 @@ class AdvancedChunker:
         else:
             chunks = self._standard_chunking(text, config)
             
-        # Post-process chunks
+        # Post-process chunks; each chunk is independent, so large documents can fan out across cores
+        if config.parallel_metadata and config.metadata_extraction and len(chunks) > 1:
+            return self._post_process_parallel(chunks, config)
+            
         processed_chunks = []
         for i, chunk in enumerate(chunks):
             processed_chunk = self._post_process_chunk(chunk, i, config)
@@ -135,6 +176,9 @@ class AdvancedChunker:
         if not words:
             return chunks
             
+        # Character offset of each word start, so chunk positions need no re-joining of earlier words
+        word_offsets = [offset + i for i, offset in enumerate(accumulate(map(len, words), initial=0))]
+        
         current_pos = 0
         chunk_id = 0
         
@@ -151,7 +195,7 @@ class AdvancedChunker:
             chunk_text = ' '.join(chunk_words)
             
             # Calculate positions in original text
-            start_char = len(' '.join(words[:current_pos])) + (1 if current_pos > 0 else 0)
+            start_char = word_offsets[current_pos]
             end_char = start_char + len(chunk_text)
             
             # Create chunk
@@ -421,7 +465,7 @@ class AdvancedChunker:
         chunks = []
         
         # Split into sentences
-        sentences = re.split(r'[.!?]+', text)
+        sentences = _SENTENCE_SPLIT.split(text)
         sentences = [s.strip() for s in sentences if s.strip()]
         
         current_chunk = ""
@@ -501,39 +545,37 @@ class AdvancedChunker:
     def _find_sections(self, text: str, patterns: List[str]) -> List[Dict]:
         """Find sections based on patterns"""
         sections = []
-        lines = text.split('\n')
         current_section = {'text': '', 'start_pos': 0, 'title': '', 'level': 0}
+        boundaries = _compile_boundaries(tuple(patterns))
+        line_start = 0
         
-        for i, line in enumerate(lines):
+        # Track sections by offset and slice each one out of text once it closes
+        for line in text.split('\n'):
             line_stripped = line.strip()
             
             # Check if line matches any section pattern
-            section_match = None
-            for pattern in patterns:
-                match = re.match(pattern, line_stripped)
-                if match:
-                    section_match = match
-                    break
-                    
-            if section_match:
+            if any(boundary.match(line_stripped) for boundary in boundaries):
                 # Save previous section
-                if current_section['text'].strip():
-                    current_section['end_pos'] = current_section['start_pos'] + len(current_section['text'])
-                    sections.append(current_section.copy())
+                section_text = text[current_section['start_pos']:line_start]
+                if section_text.strip():
+                    current_section['text'] = section_text
+                    current_section['end_pos'] = line_start
+                    sections.append(current_section)
                     
                 # Start new section
                 current_section = {
-                    'text': line + '\n',
-                    'start_pos': sum(len(l) + 1 for l in lines[:i]),
+                    'text': '',
+                    'start_pos': line_start,
                     'title': line_stripped,
                     'level': self._get_section_level(line_stripped)
                 }
-            else:
-                current_section['text'] += line + '\n'
+            line_start += len(line) + 1
                 
-        # Add final section
-        if current_section['text'].strip():
-            current_section['end_pos'] = current_section['start_pos'] + len(current_section['text'])
+        # Add final section (its last line gets the same trailing newline as every other line)
+        section_text = text[current_section['start_pos']:] + '\n'
+        if section_text.strip():
+            current_section['text'] = section_text
+            current_section['end_pos'] = current_section['start_pos'] + len(section_text)
             sections.append(current_section)
             
         return sections
@@ -596,23 +638,50 @@ class AdvancedChunker:
     def _post_process_chunk(self, chunk: TextChunk, index: int, config: ChunkConfig) -> TextChunk:
         """Post-process chunk to add metadata and quality scoring"""
         if config.metadata_extraction:
+            # Split sentences once for both the summary and the quality score
+            sentences = _SENTENCE_SPLIT.split(chunk.text)
+            
             # Generate summary
-            chunk.summary = self._generate_summary(chunk.text)
+            chunk.summary = self._generate_summary(chunk.text, sentences)
             
             # Extract keywords
             chunk.keywords = self._extract_keywords(chunk.text)
             
             # Calculate quality score
-            chunk.quality_score = self._calculate_chunk_quality(chunk)
+            chunk.quality_score = self._calculate_chunk_quality(chunk, sentences)
             
             # Generate source citation
             chunk.source_citation = f"Chunk {index + 1}"
             
         return chunk
         
-    def _generate_summary(self, text: str) -> str:
+    def _post_process_parallel(self, chunks: List[TextChunk], config: ChunkConfig) -> List[TextChunk]:
+        """Post-process chunks in worker processes, keeping chunk order"""
+        workers = config.metadata_workers or os.cpu_count() or 1
+        chunksize = max(1, len(chunks) // (workers * 4))
+        executor = self._get_metadata_pool(workers)
+        return list(executor.map(_post_process_in_worker, chunks, range(len(chunks)), repeat(config),
+                                 chunksize=chunksize))
+        
+    def _get_metadata_pool(self, workers: int) -> ProcessPoolExecutor:
+        """Return the metadata worker pool, restarting it only if the worker count changed"""
+        if self._metadata_pool is None or self._metadata_pool_workers != workers:
+            self.close()
+            self._metadata_pool = ProcessPoolExecutor(max_workers=workers)
+            self._metadata_pool_workers = workers
+        return self._metadata_pool
+        
+    def close(self):
+        """Shut down the metadata worker pool, if one was started"""
+        if self._metadata_pool is not None:
+            self._metadata_pool.shutdown()
+            self._metadata_pool = None
+            
+
+    def _generate_summary(self, text: str, sentences: Optional[List[str]] = None) -> str:
         """Generate a simple rule-based summary"""
-        sentences = re.split(r'[.!?]+', text)
+        if sentences is None:
+            sentences = _SENTENCE_SPLIT.split(text)
         sentences = [s.strip() for s in sentences if s.strip() and len(s.split()) > 3]
         
         if not sentences:
@@ -623,27 +692,21 @@ class AdvancedChunker:
         
     def _extract_keywords(self, text: str) -> List[str]:
         """Extract keywords using simple frequency analysis"""
-        # Remove common stop words
-        stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'}
-        
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', text.lower())
-        word_freq = {}
-        
-        for word in words:
-            if word not in stop_words:
-                word_freq[word] = word_freq.get(word, 0) + 1
-                
+        # Counter tallies in C; stop words are dropped from the tally afterwards rather than per word
+        word_freq = Counter(_KEYWORD.findall(text.lower()))
+        for stop_word in _STOP_WORDS.intersection(word_freq):
+            del word_freq[stop_word]
+            
         # Return top 5 most frequent words
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words[:5]]
+        return [word for word, freq in word_freq.most_common(5)]
         
-    def _calculate_chunk_quality(self, chunk: TextChunk) -> float:
+    def _calculate_chunk_quality(self, chunk: TextChunk, sentences: Optional[List[str]] = None) -> float:
         """Calculate quality score for a chunk"""
         text = chunk.text
         
         # Basic quality metrics
         word_count = len(text.split())
-        sentence_count = len(re.split(r'[.!?]+', text))
+        sentence_count = len(sentences) if sentences is not None else len(_SENTENCE_SPLIT.split(text))
         
         # Quality factors
         quality = 1.0
@@ -40,12 +40,65 @@ except ImportError:
     HAS_SPACY = False
 
 try:
+    import torch
     from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
     HAS_SENTENCE_TRANSFORMERS = True
 except ImportError:
     HAS_SENTENCE_TRANSFORMERS = False
 
+# Patterns compiled once at import instead of on every chunk
+_SENTENCE_SPLIT = re.compile(r'[.!?]+')
+_SENTENCE_SPLIT_WITH_SPACE = re.compile(r'[.!?]+(?:\s+|$)')
+_SENTENCE_END = re.compile(r'[.!?]+\s+')
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_VERSE_MARKER = re.compile(r'॥\s*\d+\s*॥')
+_VERSE_MARKER_SPLIT = re.compile(r'(॥\s*\d+\s*॥)')
+_VERSE_SECTION = re.compile(r'(.*?)(॥\s*\d+\s*॥)(.*?)(?=॥\s*\d+\s*॥|$)', re.DOTALL)
+_DEVANAGARI = re.compile(r'[\u0900-\u097F]')
+_IAST_DIACRITICS = re.compile(r'[āīūēōṁṃṇṛḷṭḍṅñṣś]')
+_SYNONYM_GLOSS = re.compile(r'[—;].*—')
+
+_SECTION_BOUNDARY_PATTERNS = tuple(re.compile(pattern) for pattern in (
+    r'\n#{1,6}\s+.+\n',  # Markdown headers
+    r'\n[A-Z][^.\n]{10,}\n\n',  # Standalone headers
+    r'॥\s*\d+\s*॥',  # Sanskrit verse markers
+    r'\n\d+\.\d+',  # Numbered sections
+))
+
+_DOCUMENT_SECTION_PATTERNS = tuple((re.compile(pattern, re.MULTILINE), section_type) for pattern, section_type in (
+    (r'(^|\n)(#{1,6})\s+(.+)(\n|$)', 'markdown_header'),
+    (r'(^|\n)([A-Z][^.\n]{10,50})\n\n', 'text_header'),
+    (r'॥\s*(\d+)\s*॥', 'verse_marker'),
+    (r'(^|\n)(\d+\.\d+)', 'numbered_section'),
+))
+
+# Headers that introduce each verse component
+_COMPONENT_HEADERS = {
+    section_name: re.compile(rf'\n\s*{pattern}\s*\n', re.IGNORECASE)
+    for section_name, pattern in (
+        ('sanskrit', r'(sanskrit|devanagari)'),
+        ('transliteration', r'(transliteration|iast)'),
+        ('translation', r'(translation|meaning)'),
+        ('synonyms', r'(synonyms|word[\s-]for[\s-]word)'),
+        ('purport', r'(purport|commentary|explanation)'),
+    )
+}
+
+# Sentence-transformer models are loaded once per process and shared by every chunker
+_SEMANTIC_MODELS: Dict[str, Any] = {}
+
+
+def _load_semantic_model(model_name: str) -> Any:
+    """Return the shared sentence-transformer model for model_name, loading it on first use."""
+    model = _SEMANTIC_MODELS.get(model_name)
+    if model is None:
+        model = SentenceTransformer(model_name)
+        if torch.cuda.is_available():
+            # Half precision halves memory traffic and uses tensor cores
+            model = model.half().to('cuda')
+        _SEMANTIC_MODELS[model_name] = model
+    return model
+
 
 @dataclass
 class Chunk:
@@ -127,6 +180,7 @@ class ChunkingConfig:
     use_semantic_similarity: bool = False
     semantic_model: str = "all-MiniLM-L6-v2"
     similarity_threshold: float = 0.7
+    semantic_batch_size: int = 64  # Sentences per encoder forward pass
 
 
 class ChunkingStrategy(ABC):
@@ -158,10 +212,9 @@ class ChunkingStrategy(ABC):
         elif length_ratio < 0.3 or length_ratio > 2.0:
             score -= 0.2
         
-        # Content coherence - check for complete sentences
-        sentences = re.split(r'[.!?]+', text)
-        complete_sentences = [s for s in sentences if s.strip()]
-        if len(complete_sentences) >= 2:
+        # Content coherence - check for complete sentences (counted without stripped copies)
+        complete_sentences = sum(1 for s in _SENTENCE_SPLIT.split(text) if s and not s.isspace())
+        if complete_sentences >= 2:
             score += 0.1
         
         # Structural integrity - check for balanced punctuation
@@ -171,7 +224,7 @@ class ChunkingStrategy(ABC):
             score += 0.1
         
         # Content density - avoid chunks with too much whitespace
-        content_ratio = len(text.replace(' ', '').replace('\n', '')) / len(text)
+        content_ratio = (len(text) - text.count(' ') - text.count('\n')) / len(text)
         if content_ratio > 0.7:
             score += 0.1
         
@@ -182,7 +235,7 @@ class ChunkingStrategy(ABC):
         boundaries = []
         
         # Look for sentence endings
-        for match in re.finditer(r'[.!?]+\s+', text):
+        for match in _SENTENCE_END.finditer(text):
             boundaries.append(match.end())
         
         # Add text end
@@ -195,7 +248,7 @@ class ChunkingStrategy(ABC):
         boundaries = []
         
         # Look for paragraph breaks (double newlines)
-        for match in re.finditer(r'\n\s*\n', text):
+        for match in _PARAGRAPH_BREAK.finditer(text):
             boundaries.append(match.end())
         
         # Add text end
@@ -208,15 +261,8 @@ class ChunkingStrategy(ABC):
         boundaries = []
         
         # Look for section headers
-        patterns = [
-            r'\n#{1,6}\s+.+\n',  # Markdown headers
-            r'\n[A-Z][^.\n]{10,}\n\n',  # Standalone headers
-            r'॥\s*\d+\s*॥',  # Sanskrit verse markers
-            r'\n\d+\.\d+',  # Numbered sections
-        ]
-        
-        for pattern in patterns:
-            for match in re.finditer(pattern, text):
+        for pattern in _SECTION_BOUNDARY_PATTERNS:
+            for match in pattern.finditer(text):
                 boundaries.append(match.start())
         
         # Add text end
@@ -330,7 +376,7 @@ class SemanticChunker(ChunkingStrategy):
         
         if HAS_SENTENCE_TRANSFORMERS and config.use_semantic_similarity:
             try:
-                self.model = SentenceTransformer(config.semantic_model)
+                self.model = _load_semantic_model(config.semantic_model)
                 logger.info(f"Loaded semantic model: {config.semantic_model}")
             except Exception as e:
                 logger.warning(f"Failed to load semantic model: {e}")
@@ -352,8 +398,14 @@ class SemanticChunker(ChunkingStrategy):
             logger.info("Semantic model not available, falling back to sentence-based chunking")
             return self._sentence_based_chunking(text, sentences, metadata)
         
-        # Calculate sentence embeddings
-        sentence_embeddings = self.model.encode(sentences)
+        # Calculate unit-length sentence embeddings so similarities are plain dot products
+        sentence_embeddings = self.model.encode(
+            sentences,
+            batch_size=self.config.semantic_batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        ).astype(np.float32, copy=False)
         
         # Group sentences into chunks based on similarity
         chunks = self._group_by_similarity(text, sentences, sentence_embeddings, metadata)
@@ -366,15 +418,15 @@ class SemanticChunker(ChunkingStrategy):
         sentences = []
         
         # Handle verse markers specially
-        parts = re.split(r'(॥\s*\d+\s*॥)', text)
+        parts = _VERSE_MARKER_SPLIT.split(text)
         
         for part in parts:
-            if re.match(r'॥\s*\d+\s*॥', part):
+            if _VERSE_MARKER.match(part):
                 # Verse marker - keep as separate sentence
                 sentences.append(part.strip())
             else:
                 # Regular text - split into sentences
-                part_sentences = re.split(r'[.!?]+(?:\s+|$)', part)
+                part_sentences = _SENTENCE_SPLIT_WITH_SPACE.split(part)
                 for sentence in part_sentences:
                     sentence = sentence.strip()
                     if sentence and len(sentence) > 10:  # Filter very short fragments
@@ -441,25 +493,21 @@ class SemanticChunker(ChunkingStrategy):
     def _group_by_similarity(self, text: str, sentences: List[str], 
                            embeddings: np.ndarray, 
                            metadata: Optional[Dict[str, Any]]) -> List[Chunk]:
-        """Group sentences into chunks based on semantic similarity."""
+        """Group sentences into chunks based on semantic similarity of their unit-length embeddings."""
         if len(sentences) == 0:
             return []
         
         chunks = []
         current_group = [0]  # Start with first sentence
+        group_sum = embeddings[0].copy()  # Sum of the group's unit vectors
+        current_length = len(sentences[0])
         chunk_counter = 0
         
         for i in range(1, len(sentences)):
-            # Calculate similarity with current group
-            current_embedding = embeddings[i]
-            group_embeddings = embeddings[current_group]
-            
-            # Calculate average similarity to group
-            similarities = cosine_similarity([current_embedding], group_embeddings)[0]
-            avg_similarity = np.mean(similarities)
+            # Average similarity to the group: the dot product with the summed vectors, over the group size
+            avg_similarity = float(embeddings[i] @ group_sum) / len(current_group)
             
             # Check if sentence should be added to current group
-            current_length = sum(len(sentences[j]) for j in current_group)
             should_add = (
                 avg_similarity >= self.config.similarity_threshold and
                 current_length + len(sentences[i]) <= self.config.max_chunk_size
@@ -467,6 +515,8 @@ class SemanticChunker(ChunkingStrategy):
             
             if should_add:
                 current_group.append(i)
+                group_sum += embeddings[i]
+                current_length += len(sentences[i])
             else:
                 # Create chunk from current group
                 chunk = self._create_chunk_from_group(
@@ -477,6 +527,8 @@ class SemanticChunker(ChunkingStrategy):
                 
                 # Start new group
                 current_group = [i]
+                group_sum = embeddings[i].copy()
+                current_length = len(sentences[i])
         
         # Add final chunk
         if current_group:
@@ -537,18 +589,11 @@ class HierarchicalChunker(ChunkingStrategy):
         """Parse text into hierarchical sections."""
         sections = []
         
-        # Look for different types of section markers
-        patterns = [
-            (r'(^|\n)(#{1,6})\s+(.+)(\n|$)', 'markdown_header'),
-            (r'(^|\n)([A-Z][^.\n]{10,50})\n\n', 'text_header'), 
-            (r'॥\s*(\d+)\s*॥', 'verse_marker'),
-            (r'(^|\n)(\d+\.\d+)', 'numbered_section'),
-        ]
-        
         current_pos = 0
         
-        for pattern, section_type in patterns:
-            for match in re.finditer(pattern, text, re.MULTILINE):
+        # Look for different types of section markers
+        for pattern, section_type in _DOCUMENT_SECTION_PATTERNS:
+            for match in pattern.finditer(text):
                 if match.start() > current_pos:
                     # Add content before this section
                     content = text[current_pos:match.start()].strip()
@@ -667,12 +712,10 @@ class UniversalContentChunker(ChunkingStrategy):
         """Extract verse sections with their components."""
         sections = []
         
-        # Look for verse patterns (Sanskrit verse markers)
-        verse_pattern = r'(.*?)(॥\s*\d+\s*॥)(.*?)(?=॥\s*\d+\s*॥|$)'
-        
         current_pos = 0
         
-        for match in re.finditer(verse_pattern, text, re.DOTALL):
+        # Look for verse patterns (Sanskrit verse markers)
+        for match in _VERSE_SECTION.finditer(text):
             pre_verse = match.group(1).strip()
             verse_marker = match.group(2).strip()
             post_verse = match.group(3).strip()
@@ -709,33 +752,23 @@ class UniversalContentChunker(ChunkingStrategy):
         """Parse verse components (Sanskrit, translation, synonyms, purport)."""
         components = {}
         
-        # Common section headers
-        section_patterns = {
-            'sanskrit': r'(sanskrit|devanagari)',
-            'transliteration': r'(transliteration|iast)',
-            'translation': r'(translation|meaning)',
-            'synonyms': r'(synonyms|word[\s-]for[\s-]word)',
-            'purport': r'(purport|commentary|explanation)'
-        }
-        
         # Split text by common section headers
         current_text = text
         current_pos = 0
         
-        for section_name, pattern in section_patterns.items():
+        for section_name, header in _COMPONENT_HEADERS.items():
             # Look for section header
-            header_match = re.search(rf'\n\s*{pattern}\s*\n', current_text, re.IGNORECASE)
+            header_match = header.search(current_text)
             if header_match:
                 # Find where this section ends (next header or end of text)
                 start = header_match.end()
                 
                 # Look for next section
                 next_section_start = len(current_text)
-                for next_pattern in section_patterns.values():
-                    next_match = re.search(rf'\n\s*{next_pattern}\s*\n', 
-                                         current_text[start:], re.IGNORECASE)
+                for next_header in _COMPONENT_HEADERS.values():
+                    next_match = next_header.search(current_text, start)
                     if next_match:
-                        next_section_start = min(next_section_start, start + next_match.start())
+                        next_section_start = min(next_section_start, next_match.start())
                 
                 section_content = current_text[start:next_section_start].strip()
                 if section_content:
@@ -761,7 +794,7 @@ class UniversalContentChunker(ChunkingStrategy):
                 continue
             
             # Check if line contains Devanagari (Sanskrit)
-            if re.search(r'[\u0900-\u097F]', line):
+            if _DEVANAGARI.search(line):
                 if current_type != 'sanskrit':
                     if current_component and current_type:
                         components[current_type] = '\n'.join(current_component)
@@ -770,7 +803,7 @@ class UniversalContentChunker(ChunkingStrategy):
                 current_component.append(line)
             
             # Check if line looks like transliteration
-            elif re.search(r'[āīūēōṁṃṇṛḷṭḍṅñṣś]', line):
+            elif _IAST_DIACRITICS.search(line):
                 if current_type != 'transliteration':
                     if current_component and current_type:
                         components[current_type] = '\n'.join(current_component)
@@ -779,7 +812,7 @@ class UniversalContentChunker(ChunkingStrategy):
                 current_component.append(line)
             
             # Check if line looks like synonyms (contains em-dashes or semicolons)
-            elif re.search(r'[—;].*—', line) or ' — ' in line:
+            elif _SYNONYM_GLOSS.search(line) or ' — ' in line:
                 if current_type != 'synonyms':
                     if current_component and current_type:
                         components[current_type] = '\n'.join(current_component)
@@ -48,7 +48,7 @@ class ContentCategorizer:
             },
             ContentDomain.LITERATURE: {
                 'keywords': ['character', 'plot', 'story', 'narrative', 'chapter', 'novel', 'poetry', 'poem', 'verse', 'author', 'protagonist', 'antagonist', 'theme', 'metaphor', 'symbolism', 'fiction', 'non-fiction', 'literary', 'prose'],
-                'patterns': [r'Chapter \d+', r'"[^"]*"', r''[^']*'', r'\b(he|she|they) (said|thought|felt|wondered)'],
+                'patterns': [r'Chapter \d+', r'"[^"]*"', r"'[^']*'", r'\b(he|she|they) (said|thought|felt|wondered)'],
                 'structure_indicators': ['chapters', 'dialogue', 'narrative structure', 'character development']
             },
             ContentDomain.LEGAL: {
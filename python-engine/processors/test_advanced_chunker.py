@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Tests for AdvancedChunker
+
+These cover the chunker in advanced_chunking.py as it is shipped:
+- Parallel metadata post-processing matching the serial path
+- Reuse of the chunker's metadata worker pool
+
+Author: Lexicon Development Team
+"""
+
+import sys
+sys.path.append('.')
+
+from dataclasses import asdict
+
+from processors.advanced_chunking import AdvancedChunker, ChunkConfig, ChunkingStrategy
+
+
+SAMPLE_TEXT = ("Chunking splits long documents into retrievable passages. " * 30 + "\n\n") * 20
+
+
+def test_parallel_metadata_matches_serial():
+    """Test parallel post-processing produces the same chunks, in the same order, as serial."""
+    chunker = AdvancedChunker()
+    try:
+        serial = chunker.chunk_text(SAMPLE_TEXT, custom_config=ChunkConfig(
+            strategy=ChunkingStrategy.STANDARD, chunk_size=50, overlap=5
+        ))
+        parallel = chunker.chunk_text(SAMPLE_TEXT, custom_config=ChunkConfig(
+            strategy=ChunkingStrategy.STANDARD, chunk_size=50, overlap=5,
+            parallel_metadata=True, metadata_workers=2
+        ))
+    finally:
+        chunker.close()
+    
+    assert len(serial) > 1
+    assert [asdict(chunk) for chunk in parallel] == [asdict(chunk) for chunk in serial]
+
+
+def test_metadata_pool_is_reused():
+    """Test repeated parallel calls share one worker pool until close()."""
+    chunker = AdvancedChunker()
+    config = ChunkConfig(
+        strategy=ChunkingStrategy.STANDARD, chunk_size=50, overlap=5,
+        parallel_metadata=True, metadata_workers=2
+    )
+    try:
+        chunker.chunk_text(SAMPLE_TEXT, custom_config=config)
+        pool = chunker._metadata_pool
+        chunker.chunk_text(SAMPLE_TEXT, custom_config=config)
+        
+        assert pool is not None
+        assert chunker._metadata_pool is pool
+    finally:
+        chunker.close()
+    
+    assert chunker._metadata_pool is None
+
+
+def test_section_boundaries_keep_inline_flags_and_backreferences():
+    """Test caller boundary patterns match as they would on their own."""
+    chunker = AdvancedChunker()
+    text = "intro line\nCHAPTER 1\nfirst body\nxx doubled\nsecond body"
+    
+    sections = chunker._find_sections(text, [r'(?i)chapter\s+\d+', r'(\w)\1 '])
+    
+    assert [section['title'] for section in sections] == ['', 'CHAPTER 1', 'xx doubled']